@@ -0,0 +1,249 @@
+"""Benchmark cases. Every case is a function, registered with @case, that
+does its setup and returns the callable to time."""
+import os
+import atexit
+import shutil
+import tempfile
+import numpy as np
+from scipy import sparse
+import chemkin_g10.chemkin as ck
+import chemkin_g10.computation as cp
+import chemkin_g10.thermo as th
+from chemkin_g10 import backend
+from chemkin_g10.db import DatabaseOps
+from chemkin_g10.generate import generate
+from chemkin_g10.mechanism import MechanismPlan
+from chemkin_g10.rhs import ReactionRateRHS
+from chemkin_g10.simulator import Simulator
+
+ROOT = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+XML = os.path.join(ROOT, "tests", "data", "xml")
+DB = os.path.join(ROOT, "tests", "data", "db", "nasa.sqlite")
+SPECIES = ["H", "O", "OH", "H2", "H2O", "O2", "HO2", "H2O2"]
+CONCS = np.array([0.5, 0, 0, 2, 0, 1, 0, 0])
+T = 900.0
+
+# (num_species, num_reactions) of the synthetic mechanisms; the last one is
+# skipped by --quick
+SIZES = [(100, 1000), (1000, 5000)]
+
+CASES = {}
+
+
+def case(name, quick=True):
+    def register(func):
+        CASES[name] = (func, quick)
+        return func
+    return register
+
+
+def reference():
+    """A fixed NumPy workload that does not use chemkin_g10. run.py times it
+       next to the cases, so that saved timings can be compared as ratios to
+       it on another machine."""
+    rng = np.random.default_rng(0)
+    x = rng.random((300, 300))
+    idx = rng.integers(0, 300, (300, 4))
+    return lambda: np.prod(x[:, idx] ** 1.5, axis=-1).dot(np.exp(-x))
+
+
+def bundled_system(xml="rxns_reversible.xml"):
+    rsystem = ck.ReactionSystem(T, 8.314, DB)
+    rsystem.buildFromXml(os.path.join(XML, xml), CONCS)
+    return rsystem
+
+
+def synthetic_state(num_species, num_reactions, seed=0):
+    """A random sparse mechanism with 1-2 reactants and 1-2 products per
+       reaction, half of them reversible, with NASA coefficients recycled
+       from the bundled database."""
+    rng = np.random.default_rng(seed)
+    nu_react = sparse.lil_matrix((num_species, num_reactions))
+    nu_prod = sparse.lil_matrix((num_species, num_reactions))
+    for j in range(num_reactions):
+        species = rng.choice(num_species, 4, replace=False)
+        n_react, n_prod = rng.integers(1, 3, 2)
+        nu_react[species[:n_react], j] = rng.integers(1, 3, n_react)
+        nu_prod[species[2:2 + n_prod], j] = 1.0
+    plan = MechanismPlan(nu_react, nu_prod, rng.random(num_reactions) < 0.5)
+    with DatabaseOps(DB) as dbops:
+        a = dbops.get_coeffs(SPECIES, T)[np.arange(num_species) % len(SPECIES)]
+    k = rng.uniform(1e3, 1e6, num_reactions)
+    kb = np.where(plan.reversible, rng.uniform(1e3, 1e6, num_reactions), 0.0)
+    return plan, k, kb, rng.random(num_species), a
+
+
+# kinetics kernels on the bundled mechanism ---------------------------------
+
+@case("progress_rate/bundled")
+def progress_rate_bundled():
+    rsystem = bundled_system()
+    args = (rsystem.nu_react, rsystem.nu_prod, rsystem.k, CONCS, T, rsystem.a, rsystem.reversibleFlagList)
+    return lambda: cp.progress_rate(*args)
+
+
+@case("reaction_rate/bundled")
+def reaction_rate_bundled():
+    rsystem = bundled_system()
+    args = (rsystem.nu_react, rsystem.nu_prod, rsystem.k, CONCS, T, rsystem.a, rsystem.reversibleFlagList)
+    return lambda: cp.reaction_rate(*args)
+
+
+@case("equilibrium_constant/bundled")
+def equilibrium_constant_bundled():
+    rsystem = bundled_system()
+    args = (rsystem.nu_react, rsystem.nu_prod, rsystem.k, T, rsystem.a, rsystem.reversibleFlagList)
+    return lambda: cp.equilibrium_constant(*args)
+
+
+@case("backward_coeffs/bundled")
+def backward_coeffs_bundled():
+    rsystem = bundled_system()
+    plan = rsystem.plan
+    k_rev = rsystem.k[plan.reversible_idx]
+    return lambda: th.backward_coeffs(k_rev, plan.nu_rev, T, rsystem.a)
+
+
+@case("rhs/bundled")
+def rhs_bundled():
+    rsystem = bundled_system()
+    rhs = backend.make_rhs(rsystem.plan, rsystem.k, rsystem.kb)
+    return lambda: rhs(CONCS)
+
+
+# kinetics kernels on synthetic mechanisms -----------------------------------
+
+def _synthetic_cases():
+    for num_species, num_reactions in SIZES:
+        size = "{}x{}".format(num_species, num_reactions)
+        quick = (num_species, num_reactions) == SIZES[0]
+
+        def state(num_species=num_species, num_reactions=num_reactions):
+            return synthetic_state(num_species, num_reactions)
+
+        @case("plan_progress_rate/" + size, quick)
+        def plan_progress_rate(state=state):
+            plan, k, kb, concs, a = state()
+            return lambda: cp.plan_progress_rate(plan, k, kb, concs)
+
+        @case("plan_reaction_rate/" + size, quick)
+        def plan_reaction_rate(state=state):
+            plan, k, kb, concs, a = state()
+            return lambda: cp.plan_reaction_rate(plan, k, kb, concs)
+
+        @case("plan_equilibrium_constant/" + size, quick)
+        def plan_equilibrium_constant(state=state):
+            plan, k, kb, concs, a = state()
+            return lambda: cp.plan_equilibrium_constant(plan, k, T, a)
+
+        @case("backend_backward_coeffs/" + size, quick)
+        def backend_backward_coeffs(state=state):
+            plan, k, kb, concs, a = state()
+            return lambda: backend.backward_coeffs(plan, k, T, a)
+
+        @case("rhs_numpy/" + size, quick)
+        def rhs_numpy(state=state):
+            plan, k, kb, concs, a = state()
+            rhs = ReactionRateRHS(plan, k, kb)
+            return lambda: rhs(concs)
+
+        @case("rhs_backend/" + size, quick)
+        def rhs_backend(state=state):
+            plan, k, kb, concs, a = state()
+            rhs = backend.make_rhs(plan, k, kb)
+            return lambda: rhs(concs)
+
+        @case("plan_jacobian_sparse/" + size, quick)
+        def plan_jacobian_sparse(state=state):
+            plan, k, kb, concs, a = state()
+            return lambda: cp.plan_jacobian(plan, k, kb, concs, sparse_output=True)
+
+_synthetic_cases()
+
+
+# database -------------------------------------------------------------------
+
+@case("get_coeffs/scalar_T")
+def get_coeffs_scalar():
+    dbops = DatabaseOps(DB)
+    dbops.get_coeffs(SPECIES, T)
+    return lambda: dbops.get_coeffs(SPECIES, T)
+
+
+@case("get_coeffs/1000_T")
+def get_coeffs_sweep():
+    dbops = DatabaseOps(DB)
+    temps = np.linspace(300.0, 3000.0, 1000)
+    return lambda: dbops.get_coeffs(SPECIES, temps)
+
+
+@case("get_coeffs/cold")
+def get_coeffs_cold():
+    def run():
+        # the last close drops the shared tables, so every run reloads them
+        with DatabaseOps(DB) as dbops:
+            dbops.get_coeffs(SPECIES, T)
+    return run
+
+
+# parsing and building -------------------------------------------------------
+
+@case("parse/rxns_reversible")
+def parse_bundled():
+    return lambda: ck.ReactionSystem.parse(os.path.join(XML, "rxns_reversible.xml"), T, 8.314)
+
+
+@case("buildFromXml/rxns_reversible")
+def build_bundled():
+    rsystem = ck.ReactionSystem(T, 8.314, DB)
+    return lambda: rsystem.buildFromXml(os.path.join(XML, "rxns_reversible.xml"), CONCS)
+
+
+_generated = {}
+
+
+def generated_files(num_species, num_reactions):
+    """Mechanism XML and thermo database written by chemkin_g10.generate,
+    once per run"""
+    size = (num_species, num_reactions)
+    if size not in _generated:
+        tmp = tempfile.mkdtemp(prefix="chemkin_g10_bench-")
+        atexit.register(shutil.rmtree, tmp, True)
+        xml, db = os.path.join(tmp, "mech.xml"), os.path.join(tmp, "thermo.sqlite")
+        generate(xml, db, num_species, num_reactions, seed=0)
+        _generated[size] = (xml, db)
+    return _generated[size]
+
+
+def _generated_cases():
+    for num_species, num_reactions in SIZES:
+        size = "{}x{}".format(num_species, num_reactions)
+        quick = (num_species, num_reactions) == SIZES[0]
+
+        @case("parse/synthetic_" + size, quick)
+        def parse_generated(num_species=num_species, num_reactions=num_reactions):
+            xml, db = generated_files(num_species, num_reactions)
+            return lambda: ck.ReactionSystem.parse(xml, T, 8.314)
+
+        @case("buildFromXml/synthetic_" + size, quick)
+        def build_generated(num_species=num_species, num_reactions=num_reactions):
+            xml, db = generated_files(num_species, num_reactions)
+            rsystem = ck.ReactionSystem(T, 8.314, db)
+            concs = np.ones(num_species)
+            return lambda: rsystem.buildFromXml(xml, concs)
+
+_generated_cases()
+
+
+# simulator ------------------------------------------------------------------
+
+@case("solveODE/odeint")
+def solve_odeint():
+    simulation = Simulator(bundled_system(), 0.1)
+    return simulation.solveODE
+
+
+@case("solveODE/BDF")
+def solve_bdf():
+    simulation = Simulator(bundled_system(), 0.1, solver="BDF")
+    return simulation.solveODE
@@ -0,0 +1,81 @@
+"""Run the benchmark suite, save baselines and check for regressions.
+
+    python benchmarks/run.py                                    # run and print
+    python benchmarks/run.py --save my_baseline.json            # record a baseline
+    python benchmarks/run.py --compare benchmarks/baseline.json # fail on regressions
+
+Each case is timed with timeit: the number of calls per run is picked so a
+run lasts at least 0.2 s, and the best of --repeat runs is kept (per-call
+seconds). A fixed NumPy workload (cases.reference) is timed as well and
+saved with the results; --compare divides every timing by the reference of
+its own run, so a baseline saved on one machine can be checked on another.
+A case regresses when it is more than --threshold times slower than its
+baseline; the exit status is 1 if any case regresses.
+"""
+import os
+import sys
+import json
+import argparse
+import platform
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from benchmarks.cases import CASES, reference  # noqa: E402
+
+
+def measure(func, repeat):
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="chemkin_g10 benchmarks")
+    parser.add_argument("--filter", default="", help="only run cases whose name contains this")
+    parser.add_argument("--quick", action="store_true", help="skip the largest synthetic mechanisms")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per case, the best is kept")
+    parser.add_argument("--save", metavar="FILE", help="write the results as a baseline")
+    parser.add_argument("--compare", metavar="FILE", help="compare against a saved baseline")
+    parser.add_argument("--threshold", type=float, default=2.0,
+                        help="slowdown ratio that counts as a regression (default 2.0)")
+    args = parser.parse_args(argv)
+
+    baseline, base_reference = {}, None
+    if args.compare:
+        with open(args.compare) as f:
+            saved = json.load(f)
+        baseline, base_reference = saved["results"], saved.get("reference")
+
+    ref_seconds = measure(reference(), args.repeat)
+    print("{:<40s} {:>12.3f} us".format("(reference)", ref_seconds * 1e6), flush=True)
+    # baselines without a reference are compared in absolute time
+    scale = 1.0 if base_reference is None else base_reference / ref_seconds
+
+    results, regressions = {}, []
+    for name, (setup, quick) in CASES.items():
+        if args.filter not in name or (args.quick and not quick):
+            continue
+        seconds = measure(setup(), args.repeat)
+        results[name] = seconds
+        line = "{:<40s} {:>12.3f} us".format(name, seconds * 1e6)
+        if name in baseline:
+            ratio = seconds * scale / baseline[name]
+            line += "  x{:.2f}".format(ratio)
+            if ratio > args.threshold:
+                line += "  REGRESSION"
+                regressions.append(name)
+        print(line, flush=True)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(dict(machine=platform.platform(), python=platform.python_version(),
+                           reference=ref_seconds, results=results), f, indent=1, sort_keys=True)
+    if regressions:
+        print("{} regression(s) above x{}: {}".format(len(regressions), args.threshold, ", ".join(regressions)))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,204 @@
+"""Compiled kinetics kernels over the arrays of a MechanismPlan.
+
+When numba is installed the kernels below are compiled with @njit and used
+for single-state evaluations (one temperature, one concentration set), which
+is what the ODE solvers do millions of times. Without numba, or for batched
+inputs, every function falls back to the NumPy routines of computation.
+Set the environment variable CHEMKIN_G10_BACKEND=numpy to force the
+fallback.
+"""
+import os
+import numpy as np
+import chemkin_g10.computation as cp
+from chemkin_g10.rhs import ReactionRateRHS
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+if numba is not None and os.environ.get("CHEMKIN_G10_BACKEND", "numba") != "numpy":
+    BACKEND = "numba"
+    _jit = numba.njit(cache=True)
+else:
+    BACKEND = "numpy"
+    _jit = lambda func: func
+
+
+@_jit
+def _progress_rate(react_idx, react_ord, prod_idx, prod_ord, rev, k, kb, concs, out):
+    num_species = concs.shape[0]
+    for j in range(react_idx.shape[0]):
+        fwd = 1.0
+        for s in range(react_idx.shape[1]):
+            i = react_idx[j, s]
+            if i < num_species:
+                fwd *= concs[i] ** react_ord[j, s]
+        out[j] = k[j] * fwd
+    for p in range(rev.shape[0]):
+        bwd = 1.0
+        for s in range(prod_idx.shape[1]):
+            i = prod_idx[p, s]
+            if i < num_species:
+                bwd *= concs[i] ** prod_ord[p, s]
+        out[rev[p]] -= kb[rev[p]] * bwd
+
+
+@_jit
+def _csr_dot(indptr, indices, data, x, out):
+    for i in range(out.shape[0]):
+        total = 0.0
+        for q in range(indptr[i], indptr[i + 1]):
+            total += data[q] * x[indices[q]]
+        out[i] = total
+
+
+@_jit
+def _backward_coeffs(indptr, indices, data, rev, k, T, a, p0, R, out):
+    # H/RT and S/R of every species, as in thermo.H_over_RT / S_over_R
+    num_species = a.shape[0]
+    H = np.empty(num_species)
+    S = np.empty(num_species)
+    for i in range(num_species):
+        H[i] = (a[i, 0] + a[i, 1] * T / 2.0 + a[i, 2] * T**2.0 / 3.0
+                + a[i, 3] * T**3.0 / 4.0 + a[i, 4] * T**4.0 / 5.0
+                + a[i, 5] / T)
+        S[i] = (a[i, 0] * np.log(T) + a[i, 1] * T + a[i, 2] * T**2.0 / 2.0
+                + a[i, 3] * T**3.0 / 3.0 + a[i, 4] * T**4.0 / 4.0 + a[i, 6])
+    fact = p0 / R / T
+    out[:] = 0.0
+    for p in range(rev.shape[0]):
+        delta_H = 0.0
+        delta_S = 0.0
+        gamma = 0.0
+        for q in range(indptr[p], indptr[p + 1]):
+            delta_H += data[q] * H[indices[q]]
+            delta_S += data[q] * S[indices[q]]
+            gamma += data[q]
+        ke = fact**gamma * np.exp(delta_S - delta_H)
+        if ke != 0.0:
+            out[rev[p]] = k[rev[p]] / ke
+
+
+@_jit
+def _add_jacobian(reactions, coeffs, idx, order, sign, nu_indptr, nu_indices, nu_data, concs, out):
+    num_species = concs.shape[0]
+    for r in range(idx.shape[0]):
+        j = reactions[r]
+        for p in range(idx.shape[1]):
+            l = idx[r, p]
+            if l >= num_species:
+                continue
+            deriv = order[r, p] * concs[l] ** (order[r, p] - 1.0)
+            for q in range(idx.shape[1]):
+                if q != p and idx[r, q] < num_species:
+                    deriv *= concs[idx[r, q]] ** order[r, q]
+            deriv *= sign * coeffs[r]
+            # chain through column j of nu
+            for c in range(nu_indptr[j], nu_indptr[j + 1]):
+                out[nu_indices[c], l] += nu_data[c] * deriv
+
+
+def _single_state(*arrays):
+    return BACKEND == "numba" and all(np.ndim(arr) == 1 for arr in arrays)
+
+
+def progress_rate(plan, k, kb, concs):
+    """Returns the progress rate of every reaction, see
+       computation.plan_progress_rate
+    """
+    if not _single_state(k, kb, concs):
+        return cp.plan_progress_rate(plan, k, kb, concs)
+    out = np.empty(plan.num_reactions)
+    _progress_rate(plan.react_idx, plan.react_ord, plan.prod_idx, plan.prod_ord, plan.reversible_idx,
+                   np.asarray(k, dtype=float), np.asarray(kb, dtype=float), np.asarray(concs, dtype=float), out)
+    return out
+
+
+def reaction_rate(plan, k, kb, concs):
+    """Returns the reaction rate of every species, see
+       computation.plan_reaction_rate
+    """
+    if not _single_state(k, kb, concs):
+        return cp.plan_reaction_rate(plan, k, kb, concs)
+    out = np.empty(plan.num_species)
+    nu = plan.nu_csr
+    _csr_dot(nu.indptr, nu.indices, nu.data, progress_rate(plan, k, kb, concs), out)
+    return out
+
+
+def backward_coeffs(plan, k, T, a, p0=100000, R=8.3144598):
+    """Returns the backward reaction rate coefficients, 0 for irreversible
+       reactions (k / equilibrium_constant)
+
+    INPUTS:
+    =======
+    plan:  chemkin_g10.mechanism.MechanismPlan
+    k:     numpy array of floats, size: num_reactions
+    T:     float, or numpy array of floats
+    a:     numpy array of floats, size: num_species X 7 (num_T X num_species X 7)
+
+    RETURNS:
+    ========
+    kb: numpy array of floats, size: num_reactions (num_T X num_reactions)
+    """
+    if np.ndim(T) != 0 or not _single_state(k):
+        ke = cp.plan_equilibrium_constant(plan, k, T, a)
+        return np.divide(k, ke, out=np.zeros(np.shape(ke)), where=ke != 0)
+    out = np.empty(plan.num_reactions)
+    nu_rev = plan.nu_rev
+    _backward_coeffs(nu_rev.indptr, nu_rev.indices, nu_rev.data, plan.reversible_idx, np.asarray(k, dtype=float),
+                     float(T), np.asarray(a, dtype=float), float(p0), float(R), out)
+    return out
+
+
+def jacobian(plan, k, kb, concs):
+    """Returns the dense analytic Jacobian of the species reaction rates, see
+       computation.plan_jacobian
+    """
+    if not _single_state(k, kb, concs):
+        return cp.plan_jacobian(plan, k, kb, concs)
+    k = np.asarray(k, dtype=float)
+    kb = np.asarray(kb, dtype=float)
+    concs = np.asarray(concs, dtype=float)
+    out = np.zeros((plan.num_species, plan.num_species))
+    nu, rev = plan.nu, plan.reversible_idx
+    _add_jacobian(np.arange(plan.num_reactions), k, plan.react_idx, plan.react_ord, 1.0,
+                  nu.indptr, nu.indices, nu.data, concs, out)
+    if len(rev):
+        _add_jacobian(rev, kb[rev], plan.prod_idx, plan.prod_ord, -1.0,
+                      nu.indptr, nu.indices, nu.data, concs, out)
+    return out
+
+
+class _CompiledRHS:
+    """ODE right-hand side over the compiled kernels, with the same interface
+       and buffer reuse as rhs.ReactionRateRHS"""
+    def __init__(self, plan, k, kb):
+        nu = plan.nu_csr
+        self.kernel_args = (plan.react_idx, plan.react_ord, plan.prod_idx, plan.prod_ord, plan.reversible_idx,
+                            np.array(k, dtype=float), np.array(kb, dtype=float))
+        self.nu_args = (nu.indptr, nu.indices, nu.data)
+        self.progress = np.empty(plan.num_reactions)
+        self.out = np.empty(plan.num_species)
+
+    def progress_rate(self, concs):
+        _progress_rate(*self.kernel_args, np.asarray(concs, dtype=float), self.progress)
+        return self.progress
+
+    def __call__(self, concs, t=None):
+        _csr_dot(*self.nu_args, self.progress_rate(concs), self.out)
+        return self.out
+
+
+def make_rhs(plan, k, kb):
+    """Return the fastest available ODE right-hand side for one temperature
+
+    RETURNS:
+    ========
+    rhs: callable rhs(concs, t=None) -> reaction rates, num_species; the
+         returned array is reused by the next call
+    """
+    if BACKEND == "numba":
+        return _CompiledRHS(plan, k, kb)
+    return ReactionRateRHS(plan, k, kb)
@@ -0,0 +1,156 @@
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+import numpy as np
+from pathlib import Path
+import chemkin_g10.chemkin as ck
+from chemkin_g10.dbtool import to_records
+
+# bump whenever the layout of an entry changes, older entries are then rebuilt
+CACHE_VERSION = 1
+
+
+class MechanismCache:
+    """The class that keeps compiled mechanisms on disk, so that building a
+       ReactionSystem from an unchanged XML file skips parsing and the
+       thermo database.
+
+       Every entry is a directory named after a hash of the XML bytes and of
+       the db file bytes. It holds a JSON header (species and per-reaction
+       metadata), the COO stoichiometry as .npy arrays and the NASA
+       coefficients of the species as a .npy coefficient file. The arrays are
+       memory-mapped on load. Editing either file changes the key; the entry
+       of the old contents of the same (XML, db) pair is removed when the new
+       one is stored. A mechanism whose species ranges do not meet at a
+       common Tmid cannot be stored as a coefficient file, and is not cached.
+
+    Parameters
+    ----------
+    cacheDir: string, optional
+              where the entries live; defaults to $CHEMKIN_G10_CACHE, or
+              ~/.cache/chemkin_g10
+    """
+    def __init__(self, cacheDir=None):
+        if cacheDir is None:
+            cacheDir = os.environ.get("CHEMKIN_G10_CACHE", Path.home() / ".cache" / "chemkin_g10")
+        self.cacheDir = Path(cacheDir).expanduser()
+
+    def key(self, inputFile, dbFileName):
+        """Return the hex digest identifying the contents of both files"""
+        digest = hashlib.sha256(str(CACHE_VERSION).encode())
+        for fileName in (inputFile, dbFileName):
+            with open(fileName, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(chunk)
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _entries(self):
+        if not self.cacheDir.is_dir():
+            return []
+        # .tmp-* directories are entries another process is still writing
+        return [entry for entry in self.cacheDir.iterdir()
+                if not entry.name.startswith(".tmp-") and (entry / "header.json").is_file()]
+
+    def load(self, inputFile, dbFileName, T, R):
+        """Return the cached mechanism of inputFile, or None on a miss
+
+        INPUTS:
+        =======
+        inputFile:  str, the XML file
+        dbFileName: str, the thermo database it was built with
+        T, R:       the temperature and gas constant of the rate coefficients
+
+        RETURNS:
+        ========
+        (reactionList, species, nasaFile), nasaFile being the .npy coefficient
+        file of the species, or None
+        """
+        entry = self.cacheDir / self.key(inputFile, dbFileName)
+        try:
+            with open(entry / "header.json") as f:
+                header = json.load(f)
+            rows, bounds, react, prod = [np.load(entry / "{}.npy".format(name), mmap_mode='r')
+                                         for name in ("rows", "bounds", "react", "prod")]
+        except (OSError, ValueError):
+            # missing or half-written entry
+            return None
+
+        species = header["species"]
+        reactionList = []
+        for jdx, meta in enumerate(header["reactions"]):
+            part = slice(bounds[jdx], bounds[jdx + 1])
+            reactionList.append(ck.Reaction(meta["reactStr"], None, None, None, meta["rateCoeffMeta"],
+                                            meta["reactMeta"],
+                                            stoich=(len(species), rows[part], react[part], prod[part])))
+        ck.ReactionSystem._assignCoeffs(reactionList, T, R)
+        return reactionList, species, str(entry / "nasa.npy")
+
+    def store(self, inputFile, dbFileName, reactionList, species):
+        """Write a freshly parsed mechanism, replacing older entries of the
+           same XML and db files
+
+        RETURNS:
+        ========
+        nasaFile: str, the .npy coefficient file of the species, or None when
+                  the mechanism was not cached
+        """
+        try:
+            records = to_records(dbFileName, species)
+        except ValueError:
+            # e.g. ranges without a common Tmid, which a coefficient file
+            # cannot hold; the caller keeps reading the database itself
+            return None
+
+        key = self.key(inputFile, dbFileName)
+        source = str(Path(inputFile).resolve())
+        db = str(Path(dbFileName).resolve())
+        terms = [r.nonzeroCoeffs() for r in reactionList]
+        header = dict(version=CACHE_VERSION,
+                      source=source,
+                      db=db,
+                      species=list(species),
+                      reactions=[dict(reactStr=r.reactStr,
+                                      rateCoeffMeta={par: val for par, val in r.rateCoeffMeta.items()
+                                                     if par not in ("T", "R")},
+                                      reactMeta=dict(r.reactMeta)) for r in reactionList])
+
+        self.cacheDir.mkdir(parents=True, exist_ok=True)
+        tmp = Path(tempfile.mkdtemp(dir=str(self.cacheDir), prefix=".tmp-"))
+        try:
+            np.save(tmp / "rows.npy", np.concatenate([idx for idx, _, _ in terms] + [[]]).astype(np.intp))
+            np.save(tmp / "bounds.npy", np.cumsum([0] + [len(idx) for idx, _, _ in terms]).astype(np.intp))
+            np.save(tmp / "react.npy", np.concatenate([re for _, re, _ in terms] + [[]]).astype(float))
+            np.save(tmp / "prod.npy", np.concatenate([pr for _, _, pr in terms] + [[]]).astype(float))
+            np.save(tmp / "nasa.npy", records)
+            # the header goes last: an entry without one is never read
+            with open(tmp / "header.json", "w") as f:
+                json.dump(header, f)
+            os.replace(str(tmp), str(self.cacheDir / key))
+        except OSError:
+            # another process stored the same entry first
+            if not (self.cacheDir / key / "header.json").is_file():
+                raise
+        finally:
+            shutil.rmtree(str(tmp), ignore_errors=True)
+
+        for entry in self._entries():
+            if entry.name == key:
+                continue
+            try:
+                with open(entry / "header.json") as f:
+                    other = json.load(f)
+                # entries of the same XML built with another db are kept
+                stale = (other.get("source"), other.get("db", db)) == (source, db)
+            except (OSError, ValueError):
+                # unreadable: nothing says it belongs to this mechanism
+                stale = False
+            if stale:
+                shutil.rmtree(str(entry), ignore_errors=True)
+        return str(self.cacheDir / key / "nasa.npy")
+
+    def clear(self):
+        """Remove every entry"""
+        shutil.rmtree(str(self.cacheDir), ignore_errors=True)
@@ -1,7 +1,12 @@
 import numpy as np
+import weakref
 import xml.etree.ElementTree as ET
+from scipy import sparse
 import chemkin_g10.computation as cp
+from chemkin_g10 import profiling
+from chemkin_g10.mechanism import MechanismPlan
 from chemkin_g10.db import DatabaseOps as dbops
+import chemkin_g10.cache as mcache
 
 class Reaction:
     """The class that represent a single Reaction
@@ -22,29 +27,91 @@ class Reaction:
                     metadata for the reaction rate coefficient
     reactMeta:      dict
                     metadata for the reaction
+    stoich:         tuple, optional
+                    (num_species, species indices, reactant coefficients,
+                    product coefficients) of the nonzero terms only. Used by
+                    the parser in place of reactCoeff/productCoeff (pass None
+                    for both); the dense vectors are then built on first use.
     """
     def __init__(self, reactStr,
                  k, reactCoeff, productCoeff,
-                 rateCoeffMeta, reactMeta):
+                 rateCoeffMeta, reactMeta, stoich=None):
         self.reactStr = reactStr
         self.k = k
-        self.reactCoeff = reactCoeff
-        self.productCoeff = productCoeff
+        self.stoich = stoich
+        self._reactCoeff = reactCoeff
+        self._productCoeff = productCoeff
         self.rateCoeffMeta = rateCoeffMeta
         self.reactMeta = reactMeta
+        # weak references to callables run with the reaction after every
+        # updateCoeff, see ReactionSystem
+        self.listeners = []
+
+    def __getstate__(self):
+        # listeners are bound to their systems, which register again on load
+        state = self.__dict__.copy()
+        state['listeners'] = []
+        return state
+
+    def _dense(self, values):
+        coeff = np.zeros(self.stoich[0])
+        coeff[self.stoich[1]] = values
+        return coeff
+
+    @property
+    def reactCoeff(self):
+        if self._reactCoeff is None:
+            self._reactCoeff = self._dense(self.stoich[2])
+        return self._reactCoeff
+
+    @reactCoeff.setter
+    def reactCoeff(self, value):
+        self.productCoeff  # keep the other side before dropping stoich
+        self._reactCoeff = value
+        self.stoich = None
+
+    @property
+    def productCoeff(self):
+        if self._productCoeff is None:
+            self._productCoeff = self._dense(self.stoich[3])
+        return self._productCoeff
+
+    @productCoeff.setter
+    def productCoeff(self, value):
+        self.reactCoeff  # keep the other side before dropping stoich
+        self._productCoeff = value
+        self.stoich = None
+
+    def nonzeroCoeffs(self):
+        """Return the nonzero stoichiometric terms of the reaction
+
+        RETURNS:
+        ========
+        (species indices, reactant coefficients, product coefficients)
+        """
+        if self.stoich is not None:
+            return self.stoich[1:]
+        nonzero = np.flatnonzero(np.logical_or(self.reactCoeff, self.productCoeff))
+        return (nonzero, np.asarray(self.reactCoeff, dtype=float)[nonzero],
+                np.asarray(self.productCoeff, dtype=float)[nonzero])
 
     def updateCoeff(self, **args):
         """update the metadata of reaciton rate coefficient and
-           recalculate the coefficient.
+           recalculate the coefficient. Every ReactionSystem built from this
+           reaction updates its own k and rates for the change.
 
         INPUTS:
         =======
         args: T=..., R=..., type=..., A=..., b=..., E=...
+
+        A ValueError from one of those systems (e.g. for a rate coefficient
+        type it does not support) leaves the reaction as it was.
         """
+        old = dict(self.rateCoeffMeta), self.k
         for par in args:
             self.rateCoeffMeta[par] = args[par]
         meta = self.rateCoeffMeta
-        if self.rateCoeffMeta['type'] =="constant":
+        if self.rateCoeffMeta['type'] in ("constant", "Constant"):
             self.k = cp.k_const(meta['k'])
         elif self.rateCoeffMeta['type'] =="Arrhenius":
             self.k = cp.k_arr(meta['A'], meta['E'], meta['T'], meta['R'])
@@ -53,6 +120,16 @@ class Reaction:
         else:
             # Other type of reaction rate coeff
             self.k = None # k = cp.newMethodToComputeK(...)
+        try:
+            for ref in self.listeners:
+                notify = ref()
+                if notify is not None:
+                    notify(self)
+        except ValueError:
+            self.rateCoeffMeta.clear()
+            self.rateCoeffMeta.update(old[0])
+            self.k = old[1]
+            raise
         return
 
     def updateReaction(self, **args):
@@ -79,18 +156,53 @@ class ReactionSystem:
 
     Parameters
     ----------
-    T:     float or int
-           the temperature of the system
+    T:     float or int, or array of floats
+           the temperature of the system. With an array of temperatures
+           the system evaluates a whole temperature sweep at once: k, kb,
+           the NASA coefficients and the rates gain a leading num_T axis.
+           The concentrations are then either a single set, used at every
+           temperature, or num_T sets, the i-th one paired with T[i] (not
+           every set at every temperature). Any other shape is a ValueError.
     R:     float or int
            the universal gas constant
     dbFileName: string
                 the name of the db file
+    profiler:   chemkin_g10.profiling.Profiler, optional
+                counts and times XML parsing, database queries and
+                backward coefficient evaluations; also used by the
+                Simulator of the system. None (default) disables profiling.
     """
-    def __init__(self, T, R, dbFileName):
+    def __init__(self, T, R, dbFileName, profiler=None):
+        # lazily computed quantities, see _derive
+        self._derived = {}
+        self.profiler = profiler
         self.T = T
         self.R = R
+        self.dbFileName = dbFileName
         self.dbops = dbops(dbFileName)
 
+    def close(self):
+        """Release the database connection of the system"""
+        self.dbops.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __getstate__(self):
+        # the database connection can't be pickled, it's reopened on load
+        state = self.__dict__.copy()
+        del state['dbops']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.dbops = dbops(self.dbFileName)
+        if 'reactionList' in state:
+            self._listen()
+
 
     def buildFromList(self, reactionList, species, concs):
         """Build ReactionSystem from a reactionList.
@@ -100,36 +212,276 @@ class ReactionSystem:
         reactionList: list of Reaction object
         species:      list of str
         concs:        list of float
-                      initial concerntration for each species
+                      initial concerntration for each species, or
+                      num_batch X num_species array of concentration sets;
+                      with an array T, num_batch must be num_T, set i going
+                      with T[i]
 
         """
-        if len(species) != len(concs):
+        if len(species) != np.shape(concs)[-1]:
             raise ValueError("Size of concentration does not match to number of species!")
 
         self.concs = concs
         self.reactionList = reactionList
-        self.nu_react = np.array([r.reactCoeff for r in self.reactionList]).T
-        self.nu_prod = np.array([r.productCoeff for r in self.reactionList]).T
-        self.k = np.array([r.k for r in self.reactionList])
-        self.a = self.dbops.get_coeffs(self.species, self.T)
+        self.species = species
         self.reversibleFlagList = [r.reactMeta['reversible']=='yes' for r in reactionList]
-        self.progress_rate = cp.progress_rate(self.nu_react, self.nu_prod, self.k, self.concs, self.T, self.a, self.reversibleFlagList)
-        self.reaction_rate = cp.reaction_rate(self.nu_react, self.nu_prod, self.k, self.concs, self.T, self.a, self.reversibleFlagList)
-        self.equilibrium_constant = cp.equilibrium_constant(self.nu_react, self.nu_prod, self.k, self.T, self.a, self.reversibleFlagList)
+        self.compile()
+        self._listen()
+        self.rateType, self.rateA, self.rateb, self.rateE = cp.rate_params(
+            [r.rateCoeffMeta for r in self.reactionList])
+        self._checkRateTypes(self.rateType, self.reactionList)
+        self.k = cp.rate_coeffs(self.rateType, self.rateA, self.rateb, self.rateE, self.T, self.R)
+        self.a = self._getCoeffs(self.T)
+        self._derived.clear()
+        cp.check_rate_inputs(self.k, self.concs)
+
+    def updateState(self, T=None, concs=None):
+        """Move an already built system to a new temperature and/or new
+           concentrations. The mechanism is neither re-parsed nor recompiled;
+           only k and the NASA coefficients are recomputed, kb and the rates
+           on their next use. k comes from the rate parameter arrays (rateType, rateA, rateb,
+           rateE) in one vectorized pass; the k of the individual Reaction
+           objects is left at the temperature they were built with.
 
+        INPUTS:
+        =======
+        T:     float, or array of floats, optional
+               the new temperature(s)
+        concs: list of float, optional
+               the new concentration of each species (see buildFromList
+               for concentration sets and their pairing with an array T)
+
+        """
+        if concs is not None:
+            if len(self.species) != np.shape(concs)[-1]:
+                raise ValueError("Size of concentration does not match to number of species!")
+        # check the new pair as a whole, either one alone may not fit the old
+        self._checkShapes(self.T if T is None else T, self.concs if concs is None else concs)
+        if concs is not None:
+            self._concs = concs
+            self._derived.pop('progress_rate', None)
+            self._derived.pop('reaction_rate', None)
+        if T is not None:
+            self.T = T
+        cp.check_rate_inputs(self.k, self.concs)
+
+    @property
+    def T(self):
+        """The temperature(s) of the system. Setting it on a built system
+           recomputes k and the NASA coefficients."""
+        return self._T
+
+    @T.setter
+    def T(self, T):
+        if hasattr(self, '_concs'):
+            self._checkShapes(T, self._concs)
+        self._T = T if np.ndim(T) == 0 else np.asarray(T, dtype=float)
+        if hasattr(self, 'rateType'):
+            self.k = cp.rate_coeffs(self.rateType, self.rateA, self.rateb, self.rateE, self._T, self.R)
+            self.a = self._getCoeffs(self._T)
+        self._derived.clear()
+
+    @property
+    def concs(self):
+        """The concentration of each species (num_species, or num_batch X num_species)"""
+        return self._concs
+
+    @concs.setter
+    def concs(self, concs):
+        self._checkShapes(self.T, concs)
+        self._concs = concs
+        self._derived.pop('progress_rate', None)
+        self._derived.pop('reaction_rate', None)
+
+    @staticmethod
+    def _checkShapes(T, concs):
+        """Raise a ValueError unless T and concs pair up: a single
+           temperature or concentration set, or as many of one as of the other
+        """
+        T_shape, concs_shape = np.shape(T), np.shape(concs)
+        if len(T_shape) > 1 or len(concs_shape) > 2:
+            raise ValueError("T of shape {} and concs of shape {}: T must be a float or a 1D array, concs a "
+                             "1D or 2D array!".format(T_shape, concs_shape))
+        if len(T_shape) == 1 and len(concs_shape) == 2 and T_shape[0] != concs_shape[0]:
+            raise ValueError("T of shape {} and concs of shape {} do not pair up: give one concentration set, "
+                             "or one set per temperature!".format(T_shape, concs_shape))
+
+    def _getCoeffs(self, T):
+        """NASA coefficients of the species at T, from the database"""
+        with profiling.timer(self.profiler, 'db_query'):
+            return self.dbops.get_coeffs(self.species, T)
+
+    def _derive(self, name, compute):
+        """Return a derived quantity, computing it on first use after the
+           state it depends on last changed"""
+        if name not in self._derived:
+            self._derived[name] = compute()
+        return self._derived[name]
+
+    @property
+    def equilibrium_constant(self):
+        """Equilibrium constants, 0 for irreversible reactions (lazy)"""
+        return self._derive('ke', lambda: cp.plan_equilibrium_constant(self.plan, self.k, self.T, self.a))
+
+    @property
+    def ke(self):
+        """Same as equilibrium_constant"""
+        return self.equilibrium_constant
+
+    @property
+    def kb(self):
+        """Backward reaction rate coefficients, 0 for irreversible reactions (lazy)"""
+        return self.updateBackwardCoeffs()
+
+    @property
+    def progress_rate(self):
+        """Progress rate of every reaction (lazy)"""
+        return self._derive('progress_rate', lambda: cp.plan_progress_rate(self.plan, self.k, self.kb, self.concs))
+
+    @property
+    def reaction_rate(self):
+        """Reaction rate of every species (lazy)"""
+        return self._derive('reaction_rate', lambda: self.plan.nu_csr.dot(self.progress_rate.T).T)
+
+    def _listen(self):
+        """Subscribe to updateCoeff of every reaction of the system"""
+        self._reactionIndex = {id(r): jdx for jdx, r in enumerate(self.reactionList)}
+        for r in self.reactionList:
+            # weak, so reactions don't keep discarded systems alive
+            r.listeners = [ref for ref in r.listeners if getattr(ref(), '__self__', self) is not self]
+            r.listeners.append(weakref.WeakMethod(self._reactionChanged))
+
+    def _reactionChanged(self, reaction):
+        """Bring the system up to date after the rate coefficient parameters of
+           one reaction changed. Only that reaction's k, kb and progress rate
+           are recomputed; the species reaction rates get a rank-one
+           correction along its column of nu. The system keeps its own T and R.
+        """
+        jdx = self._reactionIndex.get(id(reaction))
+        if jdx is None or self.reactionList[jdx] is not reaction:
+            return
+        params = cp.rate_params([reaction.rateCoeffMeta])
+        self._checkRateTypes(params[0], [reaction])
+        # new arrays rather than writes into the old ones, which callers may
+        # still hold (e.g. the rates from before the change)
+        rate = []
+        for arr, value in zip((self.rateType, self.rateA, self.rateb, self.rateE), params):
+            arr = arr.copy()
+            arr[jdx] = value[0]
+            rate.append(arr)
+        self.rateType, self.rateA, self.rateb, self.rateE = rate
+        part = slice(jdx, jdx + 1)
+        k = self.k.copy()
+        k[..., part] = cp.rate_coeffs(*params, self.T, self.R)
+        self.k = k
+        # derived quantities not computed yet will see the new k anyway
+        derived = self._derived
+        if 'kb' in derived:
+            ke = self.ke[..., part]
+            kb = derived['kb'].copy()
+            kb[..., part] = np.divide(k[..., part], ke, out=np.zeros(np.shape(ke)), where=ke != 0)
+            derived['kb'] = kb
+        if 'progress_rate' in derived:
+            progress = cp.plan_progress_rate(self.plan, self.k, self.kb, self.concs, reactions=[jdx])
+            delta = progress - derived['progress_rate'][..., part]
+            derived['progress_rate'] = derived['progress_rate'].copy()
+            derived['progress_rate'][..., part] = progress
+            if 'reaction_rate' in derived:
+                col = slice(self.plan.nu.indptr[jdx], self.plan.nu.indptr[jdx + 1])
+                derived['reaction_rate'] = derived['reaction_rate'].copy()
+                derived['reaction_rate'][..., self.plan.nu.indices[col]] += delta * self.plan.nu.data[col]
+
+    @staticmethod
+    def _checkRateTypes(rateType, reactionList):
+        """Raise a ValueError for the first reaction of an unsupported rate
+           coefficient type"""
+        if np.any(rateType < 0):
+            pos = np.argmax(rateType < 0)
+            raise ValueError("Reaction rate coefficient type {} is not supported!".format(
+                reactionList[pos].rateCoeffMeta.get('type')))
+
+    def compile(self):
+        """Compile the stoichiometry of the reaction list into an immutable
+           MechanismPlan, which every rate routine and the Simulator work from.
+
+        RETURN:
+        =======
+        plan: chemkin_g10.mechanism.MechanismPlan
+
+        """
+        terms = [r.nonzeroCoeffs() for r in self.reactionList]
+        shape = (len(self.species), len(self.reactionList))
+        counts = [len(idx) for idx, _, _ in terms]
+        rows = np.concatenate([idx for idx, _, _ in terms] + [[]]).astype(np.intp)
+        cols = np.repeat(np.arange(len(terms), dtype=np.intp), counts)
+        nu_react = sparse.coo_matrix((np.concatenate([re for _, re, _ in terms] + [[]]), (rows, cols)), shape=shape)
+        nu_prod = sparse.coo_matrix((np.concatenate([pr for _, _, pr in terms] + [[]]), (rows, cols)), shape=shape)
+        self.plan = MechanismPlan(nu_react, nu_prod, self.reversibleFlagList)
+        return self.plan
+
+    @property
+    def nu_react(self):
+        """Dense stoichiometric coefficients of the reactants, num_species X num_reactions
+           (read-only, computed once per compiled plan)"""
+        return self.plan.nu_react_dense
+
+    @property
+    def nu_prod(self):
+        """Dense stoichiometric coefficients of the products, num_species X num_reactions
+           (read-only, computed once per compiled plan)"""
+        return self.plan.nu_prod_dense
+
+    def updateBackwardCoeffs(self):
+        """Compute the equilibrium constants and backward reaction rate coefficients
+           of all reversible reactions in one pass. The result is cached, so it
+           is only recomputed after T or k has changed.
 
-    def buildFromXml(self, inputFile, concs):
+        RETURN:
+        =======
+        kb: backward reaction rate coefficients, 0 for irreversible reactions
+
+        """
+        return self._derive('kb', self._backwardCoeffs)
+
+    def _backwardCoeffs(self):
+        with profiling.timer(self.profiler, 'backward_coeffs'):
+            ke = self.ke
+            return np.divide(self.k, ke, out=np.zeros(np.shape(ke)), where=ke != 0)
+
+
+    def buildFromXml(self, inputFile, concs, cache=None):
         """Build ReactionSystem from an input file.
 
         INPUTS:
         =======
         inputFile: str
                    file name of an XML file
+        cache:     chemkin_g10.cache.MechanismCache or str, optional
+                   a compiled-mechanism cache, or its directory. When the XML
+                   and db files are unchanged since they were cached, neither
+                   is read again: the reactions and the NASA coefficients
+                   are memory-mapped from the cache.
 
         """
 
-        reactionList, species = self.parse(inputFile, self.T, self.R)
-        if len(species) != len(concs):
+        if cache is None:
+            with profiling.timer(self.profiler, 'parse'):
+                reactionList, species = self.parse(inputFile, self.T, self.R)
+        else:
+            if not isinstance(cache, mcache.MechanismCache):
+                cache = mcache.MechanismCache(cache)
+            entry = cache.load(inputFile, self.dbFileName, self.T, self.R)
+            if entry is None:
+                with profiling.timer(self.profiler, 'parse'):
+                    reactionList, species = self.parse(inputFile, self.T, self.R)
+                nasaFile = cache.store(inputFile, self.dbFileName, reactionList, species)
+            else:
+                reactionList, species, nasaFile = entry
+            # the cached coefficients of the species replace the database
+            if nasaFile is not None:
+                self.dbops.close()
+                self.dbops = dbops(nasaFile)
+        if len(species) != np.shape(concs)[-1]:
             raise ValueError("Size of concentration does not match to number of species!")
 
         self.inputFile = inputFile
@@ -163,6 +515,11 @@ class ReactionSystem:
     def parse(cls, inputFile, T, R):
         """Parse an XML input file and return list of chemkin.Reaction metadata
 
+        The file is streamed with iterparse: every reaction is dropped from
+        the tree once read, and its nonzero stoichiometric terms go straight
+        into COO buffers shared by the whole mechanism, so memory stays
+        proportional to the number of terms, not the size of the file.
+
         INPUTS:
         =======
         inputFile:XML file,
@@ -176,71 +533,117 @@ class ReactionSystem:
         RETURNS:
         ========
         reactionList: list of chemkin.Reaction metadata
+        species:      list of str
 
         EXAMPLES:
         =========
         >>> type( cp.parse( "./test1.xml", 340, 8.314)[0] )
         <class 'chemkin.Reaction'>
         """
+        species, index = None, None
+        reactionList = [] # list of "Reaction"
+        # COO buffers of the whole mechanism; every Reaction gets views of them
+        rows, react, prod, bounds = [], [], [], [0]
+        reactionData = None
         try:
-            tree = ET.parse(inputFile)
-        except:
+            for event, elem in ET.iterparse(inputFile, events=("start", "end")):
+                if event == "start":
+                    if elem.tag == "reactionData":
+                        reactionData = elem
+                    continue
+                if elem.tag == "speciesArray":
+                    species = elem.text.split()
+                    index = {sp: i for i, sp in enumerate(species)}
+                elif elem.tag == "reaction" and reactionData is not None:
+                    if index is None:
+                        raise ValueError("The speciesArray must come before the reactions!")
+                    reactionList.append(cls._parseReaction(elem, index, T, R, rows, react, prod))
+                    bounds.append(len(rows))
+                    # drop the finished reaction so the tree never grows
+                    reactionData.clear()
+        except (ET.ParseError, OSError):
+            raise ValueError("Must be a valid xml file!")
+        if species is None:
             raise ValueError("Must be a valid xml file!")
-        root = tree.getroot()
-        species = root.find("phase").find("speciesArray").text.strip().split(" ")
-        # print(species)
 
-        reactionData = root.find("reactionData")
-        reactionList = [] # list of "Reaction"
-        for row in reactionData:
-
-            # reaction formula
-            reactStr = row.find("equation").text
-
-            # metadata for rate coeff and reaction
-            rateCoeffMeta = dict()
-            rateCoeffMeta["T"] = T
-            rateCoeffMeta["R"] = R
-            reactMeta = row.attrib # reversible/irreversible, type, id ...
-
-            # Parse reaction rate coeff parameters and save to rateCoeffMeta
-            coeffSection = row.find("rateCoeff")
-            k = None
-            if coeffSection.find("Constant") != None:
-                rateCoeffMeta["type"] = "Constant"
-                k = cp.k_const(float(coeffSection.find("Constant").find("k").text))
-            elif coeffSection.find("Arrhenius") != None:
-                rateCoeffMeta["type"] = "Arrhenius"
-                rateCoeffMeta["A"] = float(coeffSection.find("Arrhenius").find("A").text)
-                rateCoeffMeta["E"] = float(coeffSection.find("Arrhenius").find("E").text)
-                k = cp.k_arr(rateCoeffMeta["A"], rateCoeffMeta["E"], T, R)
-            elif coeffSection.find("modifiedArrhenius") != None:
-                rateCoeffMeta["type"] = "modifiedArrhenius"
-                rateCoeffMeta["A"] = float(coeffSection.find("modifiedArrhenius").find("A").text)
-                rateCoeffMeta["b"] = float(coeffSection.find("modifiedArrhenius").find("b").text)
-                rateCoeffMeta["E"] = float(coeffSection.find("modifiedArrhenius").find("E").text)
-                k = cp.k_mod_arr(rateCoeffMeta["A"], rateCoeffMeta["b"], rateCoeffMeta["E"], T, R)
+        rows = np.array(rows, dtype=np.intp)
+        react = np.array(react, dtype=float)
+        prod = np.array(prod, dtype=float)
+        for jdx, reaction in enumerate(reactionList):
+            part = slice(bounds[jdx], bounds[jdx + 1])
+            reaction.stoich = (len(species), rows[part], react[part], prod[part])
+        cls._assignCoeffs(reactionList, T, R)
+        return reactionList, species
+
+    @staticmethod
+    def _assignCoeffs(reactionList, T, R):
+        """Set T, R and k of every reaction, evaluating all the rate
+           coefficients in one vectorized pass. Reactions of an unsupported
+           rate type get k = None.
+        """
+        metas = [r.rateCoeffMeta for r in reactionList]
+        for meta in metas:
+            meta["T"] = T
+            meta["R"] = R
+        params = cp.rate_params(metas)
+        k = cp.rate_coeffs(*params, T, R)
+        # a float per reaction, or its k over the sweep for an array of T
+        sweep = np.ndim(T) > 0
+        for jdx, reaction in enumerate(reactionList):
+            if params[0][jdx] < 0:
+                reaction.k = None
             else:
-                # Other type of reaction rate coeff
-                k = None # k = cp.newMethodToComputeK(...)
-
-            # Coeffs of reactants, products
-            # Split the "_:_" pairs and get the coeff for corresponding species
-            reactCoeff = np.zeros(len(species))
-            productCoeff = np.zeros(len(species))
-            for mp in row.find("reactants").text.strip().split(" "):
-                sp, co = mp.split(":")
-                reactCoeff[species.index(sp)] = float(co)
-            for mp in row.find("products").text.strip().split(" "):
-                sp, co = mp.split(":")
-                productCoeff[species.index(sp)] = float(co)
+                reaction.k = k[..., jdx] if sweep else float(k[jdx])
 
-            # Create the Reaction object, and add to the list
-            reaction = Reaction(reactStr, k, reactCoeff, productCoeff,
-                                rateCoeffMeta, reactMeta)
-            reactionList.append(reaction)
+    @staticmethod
+    def _parseReaction(row, index, T, R, rows, react, prod):
+        """Turn one <reaction> element into a Reaction, appending its nonzero
+           stoichiometric terms to the rows/react/prod buffers.
+        """
+        # reaction formula
+        reactStr = row.find("equation").text
+
+        # metadata for rate coeff and reaction
+        rateCoeffMeta = dict()
+        rateCoeffMeta["T"] = T
+        rateCoeffMeta["R"] = R
+        reactMeta = dict(row.attrib) # reversible/irreversible, type, id ...
+
+        # Parse reaction rate coeff parameters and save to rateCoeffMeta
+        # (k itself is computed for all reactions at once by _assignCoeffs)
+        coeffSection = row.find("rateCoeff")
+        if coeffSection.find("Constant") != None:
+            rateCoeffMeta["type"] = "Constant"
+            rateCoeffMeta["k"] = float(coeffSection.find("Constant").find("k").text)
+        elif coeffSection.find("Arrhenius") != None:
+            rateCoeffMeta["type"] = "Arrhenius"
+            rateCoeffMeta["A"] = float(coeffSection.find("Arrhenius").find("A").text)
+            rateCoeffMeta["E"] = float(coeffSection.find("Arrhenius").find("E").text)
+        elif coeffSection.find("modifiedArrhenius") != None:
+            rateCoeffMeta["type"] = "modifiedArrhenius"
+            rateCoeffMeta["A"] = float(coeffSection.find("modifiedArrhenius").find("A").text)
+            rateCoeffMeta["b"] = float(coeffSection.find("modifiedArrhenius").find("b").text)
+            rateCoeffMeta["E"] = float(coeffSection.find("modifiedArrhenius").find("E").text)
+        else:
+            # Other type of reaction rate coeff
+            rateCoeffMeta["type"] = coeffSection[0].tag if len(coeffSection) else None
 
-        return reactionList, species
+        # Coeffs of reactants, products
+        # Split the "_:_" pairs and look up the species index of each term
+        terms = {}
+        for side, tag in enumerate(("reactants", "products")):
+            for mp in row.find(tag).text.split():
+                sp, co = mp.split(":")
+                if sp not in index:
+                    raise ValueError("Specie {} is not in the speciesArray!".format(sp))
+                terms.setdefault(index[sp], [0.0, 0.0])[side] = float(co)
+        for i, (re, pr) in terms.items():
+            rows.append(i)
+            react.append(re)
+            prod.append(pr)
+
+        # the stoichiometry is attached once the buffers are complete
+        return Reaction(reactStr, None, None, None, rateCoeffMeta, reactMeta)
 
     def __str__(self):
         res = "\n"
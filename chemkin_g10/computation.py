@@ -1,5 +1,7 @@
 import numpy as np
-from chemkin_g10.thermo import backward_coeffs
+from scipy import sparse
+from chemkin_g10.thermo import backward_coeffs, equilibrium_coeffs
+from chemkin_g10.mechanism import stoichiometry_lists
 
 import os
 path = os.path.dirname(os.path.realpath(__file__)) + "/../tests/"
@@ -38,8 +40,8 @@ def k_arr(A, E, T, R=8.314):
        Must be positive
     E: float
        Activation energy
-    T: float
-       Temperature
+    T: float, or numpy array of floats
+       Temperature(s)
        Must be positive
     R: float, default value = 8.314
        Ideal gas constant
@@ -47,7 +49,7 @@ def k_arr(A, E, T, R=8.314):
 
     RETURNS:
     ========
-    k: float
+    k: float, or numpy array of floats (one per temperature)
        Arrhenius reaction rate coefficient
 
     EXAMPLES:
@@ -59,8 +61,8 @@ def k_arr(A, E, T, R=8.314):
     if A < 0.0:
         raise ValueError("A = {0:18.16e}:  Negative Arrhenius prefactor is prohibited!".format(A))
 
-    if T < 0.0:
-        raise ValueError("T = {0:18.16e}:  Negative temperatures are prohibited!".format(T))
+    if np.any(np.asarray(T) < 0.0):
+        raise ValueError("T = {0:18.16e}:  Negative temperatures are prohibited!".format(np.min(T)))
 
     if R < 0.0:
         raise ValueError("R = {0:18.16e}:  Negative ideal gas constant is prohibited!".format(R))
@@ -79,8 +81,8 @@ def k_mod_arr(A, b, E, T, R=8.314):
        Modified Arrhenius parameter
     E: float
        Activation energy
-    T: float
-       Temperature
+    T: float, or numpy array of floats
+       Temperature(s)
        Must be positive
     R: float, default value = 8.314
        Ideal gas constant
@@ -88,7 +90,7 @@ def k_mod_arr(A, b, E, T, R=8.314):
 
     RETURNS:
     ========
-    k: float
+    k: float, or numpy array of floats (one per temperature)
        Modified Arrhenius reaction rate coefficient
 
     EXAMPLES:
@@ -99,15 +101,92 @@ def k_mod_arr(A, b, E, T, R=8.314):
     if A < 0.0:
         raise ValueError("A = {0:18.16e}:  Negative Arrhenius prefactor is prohibited!".format(A))
 
-    if T < 0.0:
-        raise ValueError("T = {0:18.16e}:  Negative temperatures are prohibited!".format(T))
+    if np.any(np.asarray(T) < 0.0):
+        raise ValueError("T = {0:18.16e}:  Negative temperatures are prohibited!".format(np.min(T)))
+
+    if R < 0.0:
+        raise ValueError("R = {0:18.16e}:  Negative ideal gas constant is prohibited!".format(R))
+
+    return A * T**b * np.exp(-E / R / T)
+
+# type codes of rate_params / rate_coeffs; -1 marks an unsupported type
+RATE_TYPES = {"constant": 0, "Constant": 0, "Arrhenius": 1, "modifiedArrhenius": 2}
+
+def rate_params(rateCoeffMetaList):
+    """Collects the rate coefficient parameters of many reactions into arrays
+
+    INPUTS:
+    =======
+    rateCoeffMetaList: list of dict
+                       the rateCoeffMeta of every reaction (type, k, A, b, E)
+
+    RETURNS:
+    ========
+    rateType: numpy array of ints, size: num_reactions
+              type code of every reaction, see RATE_TYPES
+    A, b, E:  numpy arrays of floats, size: num_reactions
+              prefactor (the constant k for constant rates, nan for
+              unsupported types), temperature exponent and activation
+              energy; unused entries are 0
+
+    EXAMPLES:
+    =========
+    >>> rate_params([{'type': 'Constant', 'k': 5.0}, {'type': 'Arrhenius', 'A': 2.0, 'E': 3.0}])[0]
+    array([0, 1])
+    """
+    rateType = np.array([RATE_TYPES.get(meta.get('type'), -1) for meta in rateCoeffMetaList], dtype=np.intp)
+    A = np.array([meta['k'] if t == 0 else meta['A'] if t > 0 else np.nan
+                  for t, meta in zip(rateType, rateCoeffMetaList)], dtype=float)
+    b = np.array([meta['b'] if t == 2 else 0.0 for t, meta in zip(rateType, rateCoeffMetaList)], dtype=float)
+    E = np.array([meta['E'] if t > 0 else 0.0 for t, meta in zip(rateType, rateCoeffMetaList)], dtype=float)
+
+    if np.any(A < 0.0):
+        pos = np.argmax(A < 0.0)
+        if rateType[pos] == 0:
+            raise ValueError("Negative reaction rate coefficients are prohibited.")
+        raise ValueError("A = {0:18.16e}:  Negative Arrhenius prefactor is prohibited!".format(A[pos]))
+    return rateType, A, b, E
+
+def rate_coeffs(rateType, A, b, E, T, R=8.314):
+    """Calculates the rate coefficients of every reaction at once, in one
+       vectorized expression
+
+    INPUTS:
+    =======
+    rateType, A, b, E:
+       numpy arrays, size: num_reactions
+       as returned by rate_params
+    T: float, or numpy array of floats
+       Temperature(s)
+       Must be positive
+    R: float, default value = 8.314
+       Ideal gas constant
+       Must be positive
+
+    RETURNS:
+    ========
+    k: numpy array of floats, size: num_reactions, or num_T X num_reactions
+       for an array T; nan for unsupported rate types
+
+    EXAMPLES:
+    =========
+    >>> rate_coeffs(*rate_params([{'type': 'Arrhenius', 'A': 2.0, 'E': 3.0}]), 100.0)
+    array([1.99279626])
+    """
+    T = np.asarray(T, dtype=float)
+    if np.any(T < 0.0):
+        raise ValueError("T = {0:18.16e}:  Negative temperatures are prohibited!".format(np.min(T)))
 
     if R < 0.0:
         raise ValueError("R = {0:18.16e}:  Negative ideal gas constant is prohibited!".format(R))
 
+    # b = 0 for the Arrhenius and constant rates and E = 0 for the constant
+    # ones, so one expression covers every type, with the operation order
+    # of k_const / k_arr / k_mod_arr
+    T = T[..., np.newaxis]
     return A * T**b * np.exp(-E / R / T)
 
-def progress_rate(nu_react, nu_prod, k, concs, T, a, reversibleFlagList, solvingODE=False):
+def progress_rate(nu_react, nu_prod, k, concs, T, a, reversibleFlagList, solvingODE=False, kb=None):
     """Returns the progress rate of a system elementary reactions (whether reversible or not)
     INPUTS:
     =======
@@ -131,6 +210,10 @@ def progress_rate(nu_react, nu_prod, k, concs, T, a, reversibleFlagList, solving
               array of booleans, 
               size: num_reactions
               boolean indicator indicating wether each reaction is reversible
+    kb:       array of floats, optional
+              size: num_reactions
+              precomputed backward reaction rate coefficients; when given,
+              the thermo polynomials are not evaluated again
     RETURNS:
     ========
     progress: numpy array of floats
@@ -138,41 +221,75 @@ def progress_rate(nu_react, nu_prod, k, concs, T, a, reversibleFlagList, solving
               progress rate of each reaction
     
     """
-    progress = k.copy() # Initialize progress rates with reaction rate coefficients
-
-    for jdx, rj in enumerate(progress):
-        if rj < 0:
-            raise ValueError("k = {0:18.16e}:  Negative reaction rate coefficients are prohibited!".format(rj))
-
-        # initialize the subtraction part for reversible reaction
-        if reversibleFlagList[jdx] == True:
-            sub = backward_coeffs(rj, nu_prod[:, jdx] - nu_react[:, jdx], T, a)
-        else:
-            sub = 0
-
-        for idx, xi in enumerate(concs):
-            nu_ij_r = nu_react[idx,jdx]
-            nu_ij_p = nu_prod[idx,jdx]
-            if not solvingODE and xi  < 0.0:
-                raise ValueError("x{0} = {1:18.16e}:  Negative concentrations are prohibited!".format(idx, xi))
-            if nu_ij_r < 0:
-                raise ValueError("nu_{0}{1} = {2}:  Negative stoichiometric coefficients are prohibited!".format(idx, jdx, nu_ij_r))
-            if nu_ij_p < 0:
-                raise ValueError("nu_{0}{1} = {2}:  Negative stoichiometric coefficients are prohibited!".format(idx, jdx, nu_ij_p))
-
-            # forward progress rate
-            progress[jdx] *= xi**nu_ij_r
-
-            # calculate the backward rate if this reaction is reversible
-            if reversibleFlagList[jdx] == True:
-                sub *= xi**nu_ij_p
-
-        # subtract it to get the overall progress rate
-        progress[jdx] -= sub
+    plan, k, kb, concs = _prepare(nu_react, nu_prod, k, concs, T, a, reversibleFlagList, solvingODE, kb)
+    return plan_progress_rate(plan, k, kb, concs)
 
-    return progress
+def _prepare(nu_react, nu_prod, k, concs, T, a, reversibleFlagList, solvingODE, kb):
+    """Validate dense inputs, compile them into a _DensePlan and fill in the
+       backward reaction rate coefficients if they were not given.
+    """
+    nu_react = np.asarray(nu_react)
+    nu_prod = np.asarray(nu_prod)
+    k = np.asarray(k, dtype=float)
+    concs = np.asarray(concs, dtype=float)
+    _check_progress_inputs(nu_react, nu_prod, k, concs, solvingODE)
+
+    plan = _DensePlan(nu_react, nu_prod, reversibleFlagList)
+    if kb is None:
+        kb = np.zeros(len(k))
+        if len(plan.reversible_idx):
+            rev = plan.reversible_idx
+            kb[rev] = backward_coeffs(k[rev], plan.nu_rev, T, a)
+    return plan, k, np.asarray(kb, dtype=float), concs
+
+def check_rate_inputs(k, concs):
+    """Raise a ValueError for negative reaction rate coefficients or concentrations
 
-def reaction_rate(nu_react, nu_prod, k, concs, T, a, reversibleFlagList):
+    INPUTS:
+    =======
+    k:     numpy array of floats
+           Reaction rate coefficient for the reaction, any shape
+    concs: numpy array of floats
+           concentration of species, any shape (species on the last axis)
+    """
+    k = np.asarray(k, dtype=float)
+    concs = np.asarray(concs, dtype=float)
+    if np.any(k < 0):
+        raise ValueError("k = {0:18.16e}:  Negative reaction rate coefficients are prohibited!".format(k[k < 0][0]))
+    if np.any(concs < 0.0):
+        pos = tuple(np.argwhere(concs < 0.0)[0])
+        raise ValueError("x{0} = {1:18.16e}:  Negative concentrations are prohibited!".format(pos[-1], concs[pos]))
+
+def _check_progress_inputs(nu_react, nu_prod, k, concs, solvingODE):
+    """Raise the first error that the scalar progress rate loop would have raised.
+
+    The original kernel visited reaction j, checked k_j, and then checked
+    x_i, nu_ij_r and nu_ij_p for every species i in turn. The masks below are
+    laid out in the same order, so argmax finds the same offending entry.
+    """
+    num_species, num_reactions = nu_react.shape
+    bad_k = k < 0
+    bad_x = np.zeros(num_species, dtype=bool) if solvingODE else concs < 0.0
+    bad_r = nu_react < 0
+    bad_p = nu_prod < 0
+    if not (bad_k.any() or bad_x.any() or bad_r.any() or bad_p.any()):
+        return
+
+    # mask[j] = [k_j, x_0, nu_0j_r, nu_0j_p, x_1, nu_1j_r, nu_1j_p, ...]
+    per_species = np.stack([np.broadcast_to(bad_x[:, np.newaxis], bad_r.shape), bad_r, bad_p], axis=-1)
+    per_species = per_species.transpose(1, 0, 2).reshape(num_reactions, 3 * num_species)
+    mask = np.concatenate([bad_k[:, np.newaxis], per_species], axis=1)
+    jdx, pos = np.unravel_index(np.argmax(mask), mask.shape)
+
+    if pos == 0:
+        raise ValueError("k = {0:18.16e}:  Negative reaction rate coefficients are prohibited!".format(k[jdx]))
+    idx, kind = divmod(pos - 1, 3)
+    if kind == 0:
+        raise ValueError("x{0} = {1:18.16e}:  Negative concentrations are prohibited!".format(idx, concs[idx]))
+    nu_ij = nu_react[idx, jdx] if kind == 1 else nu_prod[idx, jdx]
+    raise ValueError("nu_{0}{1} = {2}:  Negative stoichiometric coefficients are prohibited!".format(idx, jdx, nu_ij))
+
+def reaction_rate(nu_react, nu_prod, k, concs, T, a, reversibleFlagList, kb=None):
     """Returns the progress rate of a system elementary reactions (whether reversible or not)
     INPUTS:
     =======
@@ -196,6 +313,9 @@ def reaction_rate(nu_react, nu_prod, k, concs, T, a, reversibleFlagList):
               array of booleans, 
               size: num_reactions
               boolean indicator indicating wether each reaction is reversible
+    kb:       array of floats, optional
+              size: num_reactions
+              precomputed backward reaction rate coefficients
     RETURNS:
     ========
     f: numpy array of floats
@@ -203,9 +323,8 @@ def reaction_rate(nu_react, nu_prod, k, concs, T, a, reversibleFlagList):
        reaction rate of each species
     
     """
-    nu = nu_prod - nu_react
-    rj = progress_rate(nu_react, nu_prod, k, concs, T, a, reversibleFlagList)
-    return np.dot(nu, rj)
+    plan, k, kb, concs = _prepare(nu_react, nu_prod, k, concs, T, a, reversibleFlagList, False, kb)
+    return plan.nu.dot(plan_progress_rate(plan, k, kb, concs).T).T
 
 
 def equilibrium_constant(nu_react, nu_prod, k, T, a, reversibleFlagList):
@@ -237,18 +356,221 @@ def equilibrium_constant(nu_react, nu_prod, k, T, a, reversibleFlagList):
        the equilibrium constant of each reaction
     
     """
-    eq_constant = []
-    for jdx, kj in enumerate(k):
-        if kj < 0:
-            raise ValueError("k = {0:18.16e}:  Negative reaction rate coefficients are prohibited!".format(kj))
-
-        # initialize the subtraction part for reversible reaction
-        if reversibleFlagList[jdx] == True:
-            kb = backward_coeffs(kj, nu_prod[:, jdx] - nu_react[:, jdx], T, a)
-            eq_constant.append(kj / kb) # ke
-        else:
-            eq_constant.append(0) # no such constant for irreversible reaction
+    return plan_equilibrium_constant(_DensePlan(nu_react, nu_prod, reversibleFlagList), k, T, a)
+
+class _DensePlan:
+    """The parts of a MechanismPlan that plan_progress_rate and
+       plan_equilibrium_constant read, built straight from dense
+       stoichiometric matrices. The dense wrappers above compile a new
+       mechanism on every call, so this skips the sparse matrices (and the
+       Jacobian pattern) of a full MechanismPlan; nu and nu_rev are dense
+       arrays here.
+    """
+    def __init__(self, nu_react, nu_prod, reversibleFlagList):
+        nu_react = np.asarray(nu_react, dtype=float)
+        nu_prod = np.asarray(nu_prod, dtype=float)
+        self.__dict__.update(stoichiometry_lists(nu_react, nu_prod, reversibleFlagList))
+        self.num_species, self.num_reactions = nu_react.shape
+        self.nu = nu_prod - nu_react
+        self.nu_rev = self.nu[:, self.reversible_idx]
+
+def plan_progress_rate(plan, k, kb, concs, reactions=None):
+    """Returns the progress rate of every reaction of a compiled mechanism.
+       No input validation is done, so this is the kernel used while solving
+       the ODE. All inputs may carry leading batch dimensions (e.g. one row per
+       temperature), which broadcast against each other.
 
+    INPUTS:
+    =======
+    plan:  chemkin_g10.mechanism.MechanismPlan
+           compiled stoichiometry of the system
+    k:     numpy array of floats
+           size: num_reactions, or num_T X num_reactions
+           forward reaction rate coefficients
+    kb:    numpy array of floats
+           size: num_reactions, or num_T X num_reactions
+           backward reaction rate coefficients (only read for reversible reactions)
+    concs: numpy array of floats
+           size: num_species, or num_batch X num_species
+           concentration of species
+    reactions: array of ints, optional
+           only compute the progress rate of these reactions
+
+    RETURNS:
+    ========
+    progress: numpy array of floats
+              size: num_reactions, or num_batch X num_reactions
+              (len(reactions) instead of num_reactions when given)
+              progress rate of each reaction
+    """
+    # padded slots point at an extra species with concentration 1
+    concs = np.asarray(concs, dtype=float)
+    concs = np.concatenate([concs, np.ones(concs.shape[:-1] + (1,))], axis=-1)
+
+    react_idx, react_ord = plan.react_idx, plan.react_ord
+    rev, prod_idx, prod_ord = plan.reversible_idx, plan.prod_idx, plan.prod_ord
+    if reactions is not None:
+        reactions = np.atleast_1d(reactions)
+        k, kb = k[..., reactions], kb[..., reactions]
+        react_idx, react_ord = react_idx[reactions], react_ord[reactions]
+        # rows of prod_idx / prod_ord belong to the reversible reactions only
+        rev = np.flatnonzero(plan.reversible[reactions])
+        rows = np.searchsorted(plan.reversible_idx, reactions[rev])
+        prod_idx, prod_ord = prod_idx[rows], prod_ord[rows]
+
+    # forward progress rate, one product over the reactants of each reaction
+    progress = k * np.prod(concs[..., react_idx] ** react_ord, axis=-1)
+
+    # subtract the backward progress rate of the reversible reactions
+    if len(rev):
+        progress[..., rev] -= kb[..., rev] * np.prod(concs[..., prod_idx] ** prod_ord, axis=-1)
+
+    return progress
+
+def plan_reaction_rate(plan, k, kb, concs):
+    """Returns the reaction rate of every species of a compiled mechanism
+
+    INPUTS:
+    =======
+    plan:  chemkin_g10.mechanism.MechanismPlan
+           compiled stoichiometry of the system
+    k:     numpy array of floats
+           size: num_reactions, or num_T X num_reactions
+           forward reaction rate coefficients
+    kb:    numpy array of floats
+           size: num_reactions, or num_T X num_reactions
+           backward reaction rate coefficients
+    concs: numpy array of floats
+           size: num_species, or num_batch X num_species
+           concentration of species
+
+    RETURNS:
+    ========
+    f: numpy array of floats
+       size: num_species, or num_batch X num_species
+       reaction rate of each species
+    """
+    return plan.nu_csr.dot(plan_progress_rate(plan, k, kb, concs).T).T
+
+def plan_log_reaction_quotient(plan, concs):
+    """Returns the reaction quotients Q_j = prod x_i**nu_ij_p / prod x_i**nu_ij_r
+       of a compiled mechanism in log space, so large mechanisms and long
+       trajectories do not overflow.
+
+    INPUTS:
+    =======
+    plan:  chemkin_g10.mechanism.MechanismPlan
+           compiled stoichiometry of the system
+    concs: numpy array of floats
+           size: num_species, or num_times X num_species
+           concentration of species
+
+    RETURNS:
+    ========
+    log_q: numpy array of floats
+           size: num_reactions, or num_times X num_reactions
+           log |Q_j| (nan where 0/0, +-inf where Q_j is inf or 0)
+    sign:  numpy array of floats, same size as log_q
+           sign of Q_j, -1 when an odd number of negative concentrations enter it
+    """
+    concs = np.asarray(concs, dtype=float)
+    with np.errstate(divide='ignore'):
+        log_x = np.log(np.abs(concs))
+    negative = (concs < 0).astype(float)
+    with np.errstate(invalid='ignore'):
+        log_q = plan.nu_prod.T.dot(log_x.T).T - plan.nu_react.T.dot(log_x.T).T
+    parity = plan.nu_prod.T.dot(negative.T).T + plan.nu_react.T.dot(negative.T).T
+    sign = np.where(parity % 2 == 1, -1.0, 1.0)
+    return log_q, sign
+
+def plan_jacobian(plan, k, kb, concs, sparse_output=False):
+    """Returns the analytic Jacobian of the species reaction rates with respect
+       to the concentrations, d f_i / d x_l, of a compiled mechanism.
+
+       For a reaction j with reactants x_p of order nu_pj, the derivative of the
+       forward progress rate is k_j * nu_pj * x_p**(nu_pj - 1) * prod_{q != p} x_q**nu_qj,
+       and likewise for the backward term of reversible reactions.
+
+    INPUTS:
+    =======
+    plan:  chemkin_g10.mechanism.MechanismPlan
+           compiled stoichiometry of the system
+    k:     numpy array of floats
+           size: num_reactions
+           forward reaction rate coefficients
+    kb:    numpy array of floats
+           size: num_reactions
+           backward reaction rate coefficients
+    concs: numpy array of floats
+           size: num_species
+           concentration of species
+    sparse_output: bool, default value = False
+           return a scipy.sparse CSR matrix instead of a dense array
+
+    RETURNS:
+    ========
+    jac: numpy array or scipy sparse matrix of floats
+         size: num_species X num_species
+    """
+    concs = np.append(concs, 1.0)
+    rows, cols, vals = [], [], []
+
+    def add_terms(reactions, coeffs, idx, order, sign):
+        powers = concs[idx] ** order
+        for p in range(idx.shape[1]):
+            others = powers.copy()
+            others[:, p] = 1.0
+            used = idx[:, p] < plan.num_species
+            deriv = order[:, p] * concs[idx[:, p]] ** (order[:, p] - 1.0) * np.prod(others, axis=1)
+            rows.append(reactions[used])
+            cols.append(idx[used, p])
+            vals.append(sign * coeffs[used] * deriv[used])
+
+    add_terms(np.arange(plan.num_reactions), np.asarray(k, dtype=float), plan.react_idx, plan.react_ord, 1.0)
+    rev = plan.reversible_idx
+    if len(rev):
+        add_terms(rev, np.asarray(kb, dtype=float)[rev], plan.prod_idx, plan.prod_ord, -1.0)
+
+    # d r_j / d x_l, then chain through nu
+    drdx = sparse.coo_matrix((np.concatenate(vals + [[]]), (np.concatenate(rows + [[]]).astype(np.intp),
+                             np.concatenate(cols + [[]]).astype(np.intp))),
+                             shape=(plan.num_reactions, plan.num_species)).tocsr()
+    jac = plan.nu_csr.dot(drdx)
+    if sparse_output:
+        return jac.tocsr()
+    return jac.toarray()
+
+def plan_equilibrium_constant(plan, k, T, a):
+    """Returns the equilibrium constant of every reaction of a compiled mechanism
+
+    INPUTS:
+    =======
+    plan:  chemkin_g10.mechanism.MechanismPlan
+           compiled stoichiometry of the system
+    k:     numpy array of floats
+           size: num_reactions, or num_T X num_reactions
+           forward reaction rate coefficients
+    T:     float, or numpy array of floats
+           Temperature(s)
+    a:     numpy array of floats,
+           size: num_species X 7, or num_T X num_species X 7
+           nasa coefficients of each species
+
+    RETURNS:
+    ========
+    ke: numpy array of floats
+        size: num_reactions, or num_T X num_reactions
+        the equilibrium constant of each reaction, 0 for irreversible reactions
+    """
+    k = np.asarray(k, dtype=float)
+    if np.any(k < 0):
+        kj = k[k < 0][0]
+        raise ValueError("k = {0:18.16e}:  Negative reaction rate coefficients are prohibited!".format(kj))
+
+    # no such constant for irreversible reaction
+    eq_constant = np.zeros(np.shape(T) + (plan.num_reactions,))
+    if len(plan.reversible_idx):
+        eq_constant[..., plan.reversible_idx] = equilibrium_coeffs(plan.nu_rev, T, a)
     return eq_constant
 
 
@@ -1,22 +1,305 @@
 import numpy as np
 import sqlite3
+import functools
+import threading
+import collections
 from pathlib import Path
 
+_registry = {}
+_registry_lock = threading.Lock()
+# shared connections released by finalizers, which never wait for the lock
+_pending = collections.deque()
+
+
+class _SharedDatabase:
+    """One read-only connection to a db file, shared by every DatabaseOps of
+       the process that opens the same file, together with the tables loaded
+       from it. Use open_shared / release rather than creating it directly.
+
+       The file is either a SQLite database, with the original LOW and HIGH
+       tables or the packed NASA table written by chemkin_g10.dbtool, or a
+       binary coefficient file (.npy, memory-mapped, or .npz), which needs no
+       connection at all.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.RLock()
+        self.refs = 0
+        self.tables = None
+        if Path(path).suffix in (".npy", ".npz"):
+            self.db = None
+            return
+        # immutable: the file is never written, so SQLite can skip locking
+        uri = Path(path).as_uri() + "?mode=ro&immutable=1"
+        self.db = sqlite3.connect(uri, uri=True, check_same_thread=False)
+
+    def close(self):
+        """Close the connection, if there is one"""
+        if self.db is not None:
+            self.db.close()
+
+    def execute(self, query, params=()):
+        """Run one parameterized statement and fetch all rows"""
+        with self.lock:
+            return self.db.execute(query, params).fetchall()
+
+    def _read(self):
+        """Return species names, low/high ranges and low/high coefficients"""
+        if self.db is None:
+            if Path(self.path).suffix == ".npz":
+                with np.load(self.path) as archive:
+                    records = archive['nasa']
+            else:
+                records = np.load(self.path, mmap_mode='r')
+            names = [str(name) for name in records['SPECIES_NAME']]
+            low = np.stack([records['TLOW'], records['TMID']], axis=1)
+            high = np.stack([records['TMID'], records['THIGH']], axis=1)
+            return names, low, high, records['LOW'], records['HIGH']
+
+        packed = self.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", ("NASA",))
+        if packed:
+            columns = ", ".join(["SPECIES_NAME", "TLOW", "TMID", "THIGH"]
+                                + ["LOW_{}".format(i) for i in range(1, 8)]
+                                + ["HIGH_{}".format(i) for i in range(1, 8)])
+            rows = self.execute("SELECT {} FROM NASA".format(columns))
+            data = np.array([row[1:] for row in rows], dtype=float).reshape(-1, 17)
+            names = [row[0] for row in rows]
+            return names, data[:, [0, 1]], data[:, [1, 2]], data[:, 3:10], data[:, 10:]
+
+        columns = "SPECIES_NAME, TLOW, THIGH, COEFF_1, COEFF_2, COEFF_3, COEFF_4, COEFF_5, COEFF_6, COEFF_7"
+        low_rows = self.execute("SELECT {} FROM LOW".format(columns))
+        high_rows = self.execute("SELECT {} FROM HIGH".format(columns))
+        names = list(dict.fromkeys([row[0] for row in low_rows]))
+        index = {name: i for i, name in enumerate(names)}
+        tables = []
+        for rows in (low_rows, high_rows):
+            data = np.full((len(names), 9), np.nan)
+            for row in rows:
+                if row[0] in index:
+                    data[index[row[0]]] = row[1:]
+            tables.append(data)
+        return names, tables[0][:, :2], tables[1][:, :2], tables[0][:, 2:], tables[1][:, 2:]
+
+    def load(self):
+        """Read the coefficient tables into memory, once per process"""
+        with self.lock:
+            if self.tables is not None:
+                return self.tables
+            names, low, high, low_coeffs, high_coeffs = self._read()
+            tables = dict(index={name: i for i, name in enumerate(names)},
+                          low=np.asarray(low, dtype=float),
+                          high=np.asarray(high, dtype=float),
+                          low_coeffs=np.asarray(low_coeffs, dtype=float),
+                          high_coeffs=np.asarray(high_coeffs, dtype=float))
+            bounds = np.concatenate([tables['low'].ravel(), tables['high'].ravel()])
+            tables['bounds'] = np.unique(bounds[~np.isnan(bounds)])
+            for value in tables.values():
+                if isinstance(value, np.ndarray) and value.flags.owndata:
+                    value.flags.writeable = False
+            self.tables = tables
+            return tables
+
+    def select(self, species, T):
+        """Vectorized range lookup of the coefficients for scalar or array T"""
+        tables = self.load()
+        T_arr = np.asarray(T, dtype=float)[..., np.newaxis]
+        rows = np.array([tables['index'].get(s, -1) for s in species], dtype=np.intp)
+        missing = rows < 0
+        low, high = tables['low'][rows], tables['high'][rows]
+        in_low = (low[:, 0] <= T_arr) & (T_arr <= low[:, 1])
+        in_high = (high[:, 0] <= T_arr) & (T_arr <= high[:, 1])
+        beyond = ~(in_low | in_high).reshape(-1, len(rows)).all(axis=0)
+
+        # report the first offending species, whatever the reason
+        bad = missing | beyond
+        if np.any(bad):
+            pos = np.argmax(bad)
+            if missing[pos]:
+                raise ValueError("Specie {} not in the database!".format(species[pos]))
+            # The temperature T is beyond the range
+            raise ValueError("The temperate is beyond the range for species {}!".format(species[pos]))
+        return np.where(in_low[..., np.newaxis], tables['low_coeffs'][rows], tables['high_coeffs'][rows])
+
+    def lookup(self, species, bucket):
+        """Coefficients of species for any T of one bucket of the range limits"""
+        # every T inside a bucket selects the same coefficient sets, so any
+        # representative temperature of the bucket gives the answer
+        bounds = self.load()['bounds']
+        lo, hi = bucket
+        if lo != hi:
+            T = bounds[lo]
+        elif lo == 0:
+            T = bounds[0] - 1.0
+        elif lo == len(bounds):
+            T = bounds[-1] + 1.0
+        else:
+            T = 0.5 * (bounds[lo - 1] + bounds[lo])
+        a = self.select(species, T)
+        a.flags.writeable = False
+        return a
+
+
+def open_shared(fileName):
+    """Return the process-wide shared connection to a db file, opening it on
+       first use. Every call must be matched by a release.
+
+    INPUTS:
+    =======
+    fileName: string
+              the name of the db file
+
+    RETURNS:
+    ========
+    shared: _SharedDatabase
+    """
+    my_file = Path(fileName)
+    if not my_file.is_file():
+        raise ValueError("The db file: {} does not exist!".format(str(my_file)))
+    key = str(my_file.resolve())
+    with _registry_lock:
+        _release_pending()
+        shared = _registry.get(key)
+        if shared is not None:
+            shared.refs += 1
+            return shared
+    # connect outside the lock: a garbage collection during the connect may
+    # finalize a DatabaseOps, and another thread may open the file meanwhile
+    fresh = _SharedDatabase(key)
+    with _registry_lock:
+        _release_pending()
+        shared = _registry.setdefault(key, fresh)
+        shared.refs += 1
+    if shared is not fresh:
+        fresh.close()
+    return shared
+
+
+def _release(shared):
+    # the caller holds _registry_lock
+    shared.refs -= 1
+    if shared.refs == 0:
+        _registry.pop(shared.path, None)
+        shared.close()
+
+
+def _release_pending():
+    # the caller holds _registry_lock
+    while _pending:
+        _release(_pending.popleft())
+
+
+def release(shared):
+    """Drop one reference to a shared connection, closing it with the last one"""
+    with _registry_lock:
+        _release(shared)
+        _release_pending()
+
+
+def release_later(shared):
+    """release for finalizers: the reference is dropped right away when the
+       registry lock is free, otherwise by the next open_shared or release
+       (the finalizer may run while this very thread holds the lock)"""
+    _pending.append(shared)
+    if _registry_lock.acquire(blocking=False):
+        try:
+            _release_pending()
+        finally:
+            _registry_lock.release()
+
+
 class DatabaseOps:
     """The class that represent db related operations
+
+    Every DatabaseOps on the same file shares one read-only connection and
+    one in-memory copy of the LOW and HIGH tables. The tables are read in bulk
+    on the first lookup, so get_coeffs never goes back to SQLite afterwards.
+    The file may also be a database packed by chemkin_g10.dbtool, or a binary
+    .npy/.npz coefficient file exported by it, which is read without SQLite.
+    Use it as a context manager, or call close(), to release the connection.
+
     Parameters
-    
     ----------
     fileName: string
-                the name of the db file
+                the name of the db file (.sqlite, .npy or .npz)
+    cacheSize: int, default value = 128
+                number of (species, temperature range) lookups kept in the LRU cache
     """
-    def __init__(self, fileName):
-        my_file = Path(fileName)
-        if my_file.is_file():
-            self.db = sqlite3.connect(str(my_file))
-        else:
-            raise ValueError("The db file: {} does not exist!".format(str(my_file)))
+    def __init__(self, fileName, cacheSize=128):
+        self.shared = open_shared(fileName)
+        self.fileName = fileName
+        # the cache wraps the shared object, not self, so that dropping the
+        # last reference to a DatabaseOps releases it without the cyclic GC
+        self._lookup = functools.lru_cache(maxsize=cacheSize)(self.shared.lookup)
 
+    @property
+    def db(self):
+        """The shared sqlite3 connection, None for a binary coefficient file"""
+        return self.shared.db
+
+    @property
+    def tables(self):
+        """The loaded tables, None before the first lookup"""
+        return self.shared.tables
+
+    def load(self):
+        """Read the LOW and HIGH tables into memory (only done once per process)
+
+        RETURNS:
+        ========
+        tables: dict
+                'index': species name -> row, 'low'/'high': num_rows X 2
+                temperature ranges, 'low_coeffs'/'high_coeffs': num_rows X 7
+                coefficients, 'bounds': sorted distinct range limits. Species
+                missing from HIGH have an empty (nan) high range.
+        """
+        if self.shared is None:
+            raise ValueError("The database has been closed!")
+        return self.shared.load()
+
+    def close(self):
+        """Release the shared connection. Safe to call more than once."""
+        if self.shared is not None:
+            release(self.shared)
+            self.shared = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __del__(self):
+        # last resort for callers that never close; a finalizer must not wait
+        # for the registry lock, a garbage collection can run while it is held
+        if getattr(self, 'shared', None) is not None:
+            release_later(self.shared)
+            self.shared = None
+
+    def get_range_coeffs(self, species):
+        """Get both coefficient sets of every species, for callers that pick
+           the range themselves (e.g. at every step of a non-isothermal solve)
+
+        INPUTS:
+        =======
+        species: list of str
+                 all the species
+
+        RETURNS:
+        ========
+        (Tlow, Tmid, Thigh, low, high):
+                 range limits (num_species each) and low/high coefficients
+                 (num_species X 7); species without a high range get the low
+                 coefficients again and Thigh = Tmid
+        """
+        tables = self.load()
+        rows = np.array([tables['index'].get(s, -1) for s in species], dtype=np.intp)
+        if np.any(rows < 0):
+            raise ValueError("Specie {} not in the database!".format(species[np.argmax(rows < 0)]))
+        low, high = tables['low'][rows], tables['high'][rows]
+        no_high = np.isnan(high[:, 0])
+        Thigh = np.where(no_high, low[:, 1], high[:, 1])
+        high_coeffs = np.where(no_high[:, np.newaxis], tables['low_coeffs'][rows], tables['high_coeffs'][rows])
+        return low[:, 0], low[:, 1], Thigh, tables['low_coeffs'][rows], high_coeffs
 
     """Get the NASA coefficient corresbonding to the T, that is, T should be within
        the range, Tmin <= T <= Tmid or Tmid <= T <= Tmax
@@ -25,33 +308,23 @@ class DatabaseOps:
     =======
     species:   list of str
                all the species
-    T:         float
-               temperature
+    T:         float, or numpy array of floats
+               temperature(s); the low/high coefficient set is picked
+               separately for every temperature
+
+    RETURNS:
+    ========
+    a:         numpy array of floats
+               size: num_species X 7, or num_T X num_species X 7 for an array T
 
     """
     def get_coeffs(self, species, T):
-        cursor = self.db.cursor()
-        a = []
-        for s in species:
-            # check table LOW
-            query = '''SELECT * FROM LOW WHERE SPECIES_NAME="{}"'''.format(s)
-            res = cursor.execute(query).fetchall()
-            if len(res) != 1:
-                raise ValueError("Specie {} not in the database!".format(s))
-            if res[0][2] <= T and  T <= res[0][3]: # in the range
-                a.append(list(res[0][-7:]))
-                continue
-
-            # check table HIGH if not in the LOW's range
-            query = '''SELECT * FROM HIGH WHERE SPECIES_NAME="{}"'''.format(s)
-            res = cursor.execute(query).fetchall()
-            # if len(res) != 1:
-            #     raise ValueError("Specie {} not in the database!".format(s))
-            if res[0][2] <= T and  T <= res[0][3]:
-                a.append(list(res[0][-7:]))
-                continue
+        species = tuple(species)
+        bounds = self.load()['bounds']
+        if np.ndim(T) != 0:
+            return self.shared.select(species, T)
 
-            # The temperature T is beyond the range
-            raise ValueError("The temperate is beyond the range for species {}!".format(s))
-        return np.array(a)
-        
\ No newline at end of file
+        # scalar T: the range limits of the database split the temperature
+        # axis into buckets, each limit being a bucket of its own
+        bucket = (int(np.searchsorted(bounds, T, side='left')), int(np.searchsorted(bounds, T, side='right')))
+        return self._lookup(species, bucket).copy()
@@ -0,0 +1,168 @@
+"""Build optimized copies of a NASA coefficient database.
+
+    python -m chemkin_g10.dbtool pack nasa.sqlite nasa_packed.sqlite
+    python -m chemkin_g10.dbtool export nasa.sqlite nasa.npy
+
+pack writes a SQLite database with one row per species in a NASA table,
+holding both temperature ranges, indexed on SPECIES_NAME. export writes the
+same rows as a binary .npy (memory-mapped when opened) or .npz file. Both
+outputs can be given to DatabaseOps / ReactionSystem in place of the original.
+"""
+import argparse
+import sqlite3
+import numpy as np
+from pathlib import Path
+from chemkin_g10.db import DatabaseOps
+
+COEFF_NAMES = ["LOW_{}".format(i) for i in range(1, 8)] + ["HIGH_{}".format(i) for i in range(1, 8)]
+
+
+def empty_records(names):
+    """Return zeroed coefficient records for the given species names
+
+    RETURNS:
+    ========
+    records: numpy structured array, the layout of to_records
+    """
+    width = max([len(name) for name in names] + [1])
+    dtype = [('SPECIES_NAME', 'U{}'.format(width)), ('TLOW', float), ('TMID', float), ('THIGH', float),
+             ('LOW', float, 7), ('HIGH', float, 7)]
+    records = np.zeros(len(names), dtype=dtype)
+    records['SPECIES_NAME'] = names
+    return records
+
+
+def to_records(fileName, species=None):
+    """Read a coefficient database into one record per species
+
+    INPUTS:
+    =======
+    fileName: string
+              any file DatabaseOps can open
+    species:  list of str, optional
+              only export these species, in this order
+
+    RETURNS:
+    ========
+    records: numpy structured array
+             fields SPECIES_NAME, TLOW, TMID, THIGH, LOW (7) and HIGH (7);
+             THIGH and HIGH are nan for species without a high range
+    """
+    with DatabaseOps(fileName) as dbops:
+        tables = dbops.load()
+        names = sorted(tables['index'], key=tables['index'].get) if species is None else list(species)
+        for name in names:
+            if name not in tables['index']:
+                raise ValueError("Specie {} not in the database!".format(name))
+        rows = np.array([tables['index'][name] for name in names], dtype=np.intp)
+        low, high = tables['low'][rows], tables['high'][rows]
+        both = ~np.isnan(high[:, 0])
+        if np.any(low[both, 1] != high[both, 0]):
+            pos = np.flatnonzero(both)[np.argmax(low[both, 1] != high[both, 0])]
+            raise ValueError("The ranges of species {} do not meet at a common Tmid!".format(names[pos]))
+
+        records = empty_records(names)
+        records['TLOW'] = low[:, 0]
+        records['TMID'] = low[:, 1]
+        records['THIGH'] = high[:, 1]
+        records['LOW'] = tables['low_coeffs'][rows]
+        records['HIGH'] = tables['high_coeffs'][rows]
+        return records
+
+
+def save_records(records, target):
+    """Write coefficient records (see to_records) as a new database
+
+    INPUTS:
+    =======
+    records: numpy structured array
+    target:  string
+             a .npy or .npz file is written as binary, anything else as a
+             packed SQLite database (see pack_database), which must not exist
+             yet
+    """
+    if Path(target).suffix == ".npy":
+        np.save(target, records)
+        return
+    if Path(target).suffix == ".npz":
+        np.savez_compressed(target, nasa=records)
+        return
+    if Path(target).exists():
+        raise ValueError("The db file: {} already exists!".format(target))
+    rows = []
+    for r in records:
+        values = np.concatenate([[r['TLOW'], r['TMID'], r['THIGH']], r['LOW'], r['HIGH']])
+        # a missing high range is stored as NULL, which reads back as nan
+        rows.append([str(r['SPECIES_NAME'])] + [None if np.isnan(v) else float(v) for v in values])
+
+    low_coeffs = ", ".join("LOW_{0} AS COEFF_{0}".format(i) for i in range(1, 8))
+    high_coeffs = ", ".join("HIGH_{0} AS COEFF_{0}".format(i) for i in range(1, 8))
+    db = sqlite3.connect(str(target))
+    try:
+        with db:
+            db.execute("CREATE TABLE NASA (SPECIES_NAME TEXT NOT NULL, TLOW REAL, TMID REAL, THIGH REAL, {})".format(
+                ", ".join("{} REAL".format(name) for name in COEFF_NAMES)))
+            db.execute("CREATE UNIQUE INDEX NASA_SPECIES ON NASA (SPECIES_NAME)")
+            db.executemany("INSERT INTO NASA VALUES ({})".format(", ".join(["?"] * 18)), rows)
+            # the same columns, in the same order, as the original tables
+            db.execute("CREATE VIEW LOW AS SELECT rowid AS id, SPECIES_NAME, TLOW, TMID AS THIGH, {} "
+                       "FROM NASA".format(low_coeffs))
+            db.execute("CREATE VIEW HIGH AS SELECT rowid AS id, SPECIES_NAME, TMID AS TLOW, THIGH, {} FROM NASA "
+                       "WHERE THIGH IS NOT NULL".format(high_coeffs))
+    finally:
+        db.close()
+
+
+def pack_database(source, target):
+    """Write an indexed, one-row-per-species copy of a coefficient database
+
+    The NASA table has a unique index on SPECIES_NAME; LOW and HIGH views keep
+    the original two-table layout readable.
+
+    INPUTS:
+    =======
+    source: string
+            the database to pack
+    target: string
+            the new SQLite file, must not exist yet
+    """
+    if Path(target).exists():
+        raise ValueError("The db file: {} already exists!".format(target))
+    if Path(target).suffix in (".npy", ".npz"):
+        raise ValueError("The packed database must be a SQLite file!")
+    save_records(to_records(source), target)
+
+
+def export_coefficients(source, target):
+    """Write the coefficients of a database as a binary file
+
+    INPUTS:
+    =======
+    source: string
+            the database to export
+    target: string
+            the new file; a .npy file is memory-mapped when opened, a .npz
+            file is compressed
+    """
+    suffix = Path(target).suffix
+    if suffix not in (".npy", ".npz"):
+        raise ValueError("The binary coefficient file must end with .npy or .npz!")
+    save_records(to_records(source), target)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m chemkin_g10.dbtool",
+                                     description="Build optimized copies of a NASA coefficient database")
+    parser.add_argument("command", choices=["pack", "export"],
+                        help="pack: indexed SQLite database, export: binary .npy/.npz file")
+    parser.add_argument("source", help="the database to read")
+    parser.add_argument("target", help="the file to write")
+    args = parser.parse_args(argv)
+    if args.command == "pack":
+        pack_database(args.source, args.target)
+    else:
+        export_coefficients(args.source, args.target)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import numpy as np
+from scipy import sparse
+from chemkin_g10 import backend
+from chemkin_g10 import thermo as th
+
+
+class EnergyRHS:
+    """The class that evaluates the right-hand side of an adiabatic,
+       constant-volume reactor: the species concentrations together with the
+       temperature, y = [concs..., T],
+
+           d concs / dt = nu . progress_rate(concs, T)
+           dT / dt      = - sum_i U_i w_i / sum_i concs_i Cv_i
+
+       with w the species reaction rates, U_i = H_i - R T the molar internal
+       energies and Cv_i = Cp_i - R the molar heat capacities, from the NASA
+       polynomials of thermo.
+
+       T changes at every call, so k, kb and the NASA coefficients are
+       recomputed every time, but only from arrays taken once from the
+       ReactionSystem: the rate parameters (rateType, rateA, rateb, rateE) and
+       both coefficient sets of every species. Outside the temperature ranges
+       of the database the polynomial of the nearest range is extrapolated.
+
+    Parameters
+    ----------
+    rsystem: chemkin_g10.chemkin.ReactionSystem
+             a built reaction system
+    """
+    def __init__(self, rsystem):
+        self.plan = rsystem.plan
+        self.R = rsystem.R
+        # rate parameters, see computation.rate_params
+        self.A = np.array(rsystem.rateA, dtype=float)
+        self.b = np.array(rsystem.rateb, dtype=float)
+        self.E = np.array(rsystem.rateE, dtype=float)
+        _, self.Tmid, _, self.low, self.high = rsystem.dbops.get_range_coeffs(rsystem.species)
+        self.out = np.empty(self.plan.num_species + 1)
+
+    def rate_coeffs(self, T):
+        """Forward rate coefficients at T (float or array), see
+           computation.rate_coeffs"""
+        T = np.asarray(T, dtype=float)[..., np.newaxis]
+        return self.A * T**self.b * np.exp(-self.E / self.R / T)
+
+    def coeffs(self, T):
+        """NASA coefficients of every species at T (float or array), of size
+           num_species X 7 (num_T X num_species X 7)"""
+        in_low = (np.asarray(T, dtype=float)[..., np.newaxis] <= self.Tmid)[..., np.newaxis]
+        return np.where(in_low, self.low, self.high)
+
+    def __call__(self, y, t=None):
+        """Return dy/dt, size: num_species + 1. t is accepted (and ignored)
+           so the object can be handed to odeint directly; the returned
+           array is reused by the next call.
+        """
+        concs, T = y[:-1], float(y[-1])
+        k = self.rate_coeffs(T)
+        a = self.coeffs(T)
+        kb = backend.backward_coeffs(self.plan, k, T, a)
+        rates = backend.reaction_rate(self.plan, k, kb, concs)
+        # U/RT = H/RT - 1 and Cv/R = Cp/R - 1; R cancels out
+        heat_release = np.dot(th.H_over_RT(T, a) - 1.0, rates) * T
+        heat_capacity = np.dot(concs, th.Cp_over_R(T, a) - 1.0)
+        self.out[:-1] = rates
+        self.out[-1] = -heat_release / heat_capacity
+        return self.out
+
+    def jac_pattern(self):
+        """Sparsity pattern of the Jacobian of y: the one of the species,
+           plus a full row and column for T"""
+        n = self.plan.num_species
+        pattern = sparse.lil_matrix((n + 1, n + 1), dtype=bool)
+        pattern[:n, :n] = self.plan.jac_pattern
+        pattern[n, :] = True
+        pattern[:, n] = True
+        return pattern.tocsr()
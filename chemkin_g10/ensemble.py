@@ -0,0 +1,97 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from chemkin_g10.simulator import Simulator
+
+# Per-process copy of the mechanism, set once by _init_worker
+_worker = {}
+
+
+def _init_worker(rsystem, simulatorArgs):
+    """Receive the built ReactionSystem once per worker process"""
+    _worker['rsystem'] = rsystem
+    _worker['simulatorArgs'] = simulatorArgs
+    _worker['defaults'] = dict(T=rsystem.T, concs=rsystem.concs)
+
+
+def _run_scenario(index, scenario):
+    """Simulate one scenario on the worker's copy of the mechanism"""
+    rsystem = _worker['rsystem']
+    args = dict(_worker['simulatorArgs'])
+    maxTime = scenario.get('maxTime', args.pop('maxTime'))
+    # earlier scenarios moved the worker's system, so always reset both
+    defaults = _worker['defaults']
+    rsystem.updateState(T=scenario.get('T', defaults['T']), concs=scenario.get('concs', defaults['concs']))
+    simulation = Simulator(rsystem, maxTime, **args)
+    simulation.solveODE()
+    return dict(index=index,
+                scenario=scenario,
+                tout=simulation.tout,
+                yout=simulation.yout,
+                eq_point=simulation.eq_point)
+
+
+class Ensemble:
+    """This class runs many independent simulations of one reaction
+       mechanism in parallel over a pool of worker processes.
+
+       The built ReactionSystem is sent to every worker once, when the pool
+       starts; after that only the scenarios and their results cross process
+       boundaries.
+
+    Parameters
+    ----------
+    rsystem:    chemkin_g10.chemkin.ReactionSystem
+                a built reaction system; its T and concs are the defaults of
+                every scenario
+    maxTime:    float
+                default end time of the simulations
+    maxWorkers: int, default value = None
+                number of worker processes (None: one per core)
+    simulatorArgs:
+                any other keyword arguments of Simulator (numSample,
+                timeScale, eqThreshold, solver, ...)
+    """
+    def __init__(self, rsystem, maxTime, maxWorkers=None, **simulatorArgs):
+        self.rsystem = rsystem
+        self.maxTime = maxTime
+        self.maxWorkers = maxWorkers
+        self.simulatorArgs = simulatorArgs
+
+    def run(self, scenarios):
+        """Run every scenario and yield the results as they finish, which is
+           not necessarily the order of the scenarios.
+
+        INPUTS:
+        =======
+        scenarios: list of dict
+                   each with any of the keys 'T', 'concs' and 'maxTime';
+                   missing keys fall back to the defaults
+
+        RETURNS:
+        ========
+        results: generator of dict
+                 with keys 'index' (position in scenarios), 'scenario',
+                 'tout', 'yout' and 'eq_point'
+        """
+        simulatorArgs = dict(self.simulatorArgs, maxTime=self.maxTime)
+        with ProcessPoolExecutor(max_workers=self.maxWorkers, initializer=_init_worker,
+                                 initargs=(self.rsystem, simulatorArgs)) as pool:
+            futures = [pool.submit(_run_scenario, i, s) for i, s in enumerate(scenarios)]
+            for future in as_completed(futures):
+                yield future.result()
+
+    def runAll(self, scenarios):
+        """Run every scenario and return the results in scenario order
+
+        INPUTS:
+        =======
+        scenarios: list of dict
+                   see run
+
+        RETURNS:
+        ========
+        results: list of dict
+        """
+        results = [None] * len(scenarios)
+        for res in self.run(scenarios):
+            results[res['index']] = res
+        return results
@@ -0,0 +1,181 @@
+"""Write synthetic mechanisms of any size, for scaling tests.
+
+    python -m chemkin_g10.generate mech.xml thermo.sqlite --species 1000 --reactions 100000
+
+The XML file has the layout ReactionSystem.parse reads: every reaction has
+1-2 reactants and 1-2 other species as products, a Constant, Arrhenius or
+modifiedArrhenius rate coefficient and is reversible with a given
+probability. The thermo database (a packed SQLite file, or a .npy/.npz
+coefficient file, see chemkin_g10.dbtool) gives every species the NASA
+coefficients of a real species of the source database; past the size of the
+source, species are copies named <name>_<n>.
+"""
+import argparse
+import numpy as np
+from pathlib import Path
+from chemkin_g10.dbtool import to_records, empty_records, save_records
+
+DEFAULT_DB = str(Path(__file__).resolve().parent / "nasa.sqlite")
+RATE_TYPES = ("Constant", "Arrhenius", "modifiedArrhenius")
+
+_REACTION = """    <reaction reversible="{reversible}" type="Elementary" id="reaction{id}">
+      <equation>{equation}</equation>
+      <rateCoeff>
+        <{rate}>
+{params}
+        </{rate}>
+      </rateCoeff>
+      <reactants>{reactants}</reactants>
+      <products>{products}</products>
+    </reaction>
+"""
+
+
+def species_names(num_species, source=DEFAULT_DB):
+    """Return num_species distinct names built from the species of source
+
+    RETURNS:
+    ========
+    names: list of str
+    base:  numpy array of ints, the row of source each name copies
+    """
+    if num_species < 2:
+        raise ValueError("A mechanism needs at least 2 species!")
+    names = [str(name) for name in to_records(source)['SPECIES_NAME']]
+    base = np.arange(num_species) % len(names)
+    return [names[b] if i < len(names) else "{}_{}".format(names[b], i // len(names))
+            for i, b in enumerate(base)], base
+
+
+def write_thermo(target, num_species, source=DEFAULT_DB):
+    """Write the thermo database of a generated mechanism
+
+    INPUTS:
+    =======
+    target:      string, a new .sqlite, .npy or .npz file
+    num_species: int
+    source:      string, the database the coefficients are drawn from
+
+    RETURNS:
+    ========
+    species: list of str
+    """
+    names, base = species_names(num_species, source)
+    base_records = to_records(source)
+    records = empty_records(names)
+    for field in ('TLOW', 'TMID', 'THIGH', 'LOW', 'HIGH'):
+        records[field] = base_records[field][base]
+    save_records(records, target)
+    return names
+
+
+def write_mechanism(target, species, num_reactions, reversible=0.5, rate_types=RATE_TYPES, seed=None):
+    """Write a random mechanism XML file
+
+    INPUTS:
+    =======
+    target:        string, the XML file
+    species:       list of str
+    num_reactions: int
+    reversible:    float, probability that a reaction is reversible
+    rate_types:    sequence of str, the rate coefficient types to draw from
+    seed:          int, optional, seed of the random generator
+    """
+    if num_reactions < 1:
+        raise ValueError("A mechanism needs at least 1 reaction!")
+    if len(species) < 2:
+        raise ValueError("A mechanism needs at least 2 species!")
+    if not 0 <= reversible <= 1:
+        raise ValueError("The reversible fraction must be between 0 and 1!")
+    for rate in rate_types:
+        if rate not in RATE_TYPES:
+            raise ValueError("Unsupported rate coefficient type {}!".format(rate))
+
+    rng = np.random.default_rng(seed)
+    num_species = len(species)
+    is_reversible = rng.random(num_reactions) < reversible
+    rates = rng.choice(len(rate_types), num_reactions)
+    # log-uniform pre-exponential factors, activation energies in J/mol
+    A = 10.0 ** rng.uniform(3, 10, num_reactions)
+    b = rng.uniform(-1, 1, num_reactions)
+    E = rng.uniform(0, 1e5, num_reactions)
+    k = 10.0 ** rng.uniform(0, 4, num_reactions)
+
+    with open(target, "w") as f:
+        f.write('<?xml version="1.0"?>\n\n<ctml>\n\n  <phase>\n')
+        f.write("      <speciesArray> {} </speciesArray>\n".format(" ".join(species)))
+        f.write('  </phase>\n\n  <reactionData id="synthetic_mechanism">\n')
+        for j in range(num_reactions):
+            terms = rng.choice(num_species, min(4, num_species), replace=False)
+            n_react = rng.integers(1, min(2, len(terms) - 1) + 1)
+            n_prod = rng.integers(1, min(2, len(terms) - n_react) + 1)
+            react = [species[i] for i in terms[:n_react]]
+            prod = [species[i] for i in terms[n_react:n_react + n_prod]]
+            # a lone reactant is sometimes a second order one
+            react_coeffs = [rng.integers(1, 3)] if n_react == 1 else [1] * n_react
+
+            rate = rate_types[rates[j]]
+            if rate == "Constant":
+                params = [("k", k[j])]
+            elif rate == "Arrhenius":
+                params = [("A", A[j]), ("E", E[j])]
+            else:
+                params = [("A", A[j]), ("b", b[j]), ("E", E[j])]
+            f.write(_REACTION.format(
+                reversible="yes" if is_reversible[j] else "no",
+                id="{:06d}".format(j + 1),
+                equation="{} =] {}".format(" + ".join(react), " + ".join(prod)),
+                rate=rate,
+                params="\n".join("          <{0}>{1:.6e}</{0}>".format(name, val) for name, val in params),
+                reactants=" ".join("{}:{}".format(sp, co) for sp, co in zip(react, react_coeffs)),
+                products=" ".join("{}:1".format(sp) for sp in prod)))
+        f.write("  </reactionData>\n\n</ctml>\n")
+
+
+def generate(xmlFile, dbFile, num_species, num_reactions, reversible=0.5, rate_types=RATE_TYPES, seed=None,
+             source=DEFAULT_DB):
+    """Write a synthetic mechanism and its thermo database
+
+    INPUTS:
+    =======
+    xmlFile:       string, the mechanism file to write
+    dbFile:        string, the new thermo database (.sqlite, .npy or .npz)
+    num_species:   int
+    num_reactions: int
+    reversible, rate_types, seed: see write_mechanism
+    source:        string, the database the coefficients are drawn from
+
+    RETURNS:
+    ========
+    species: list of str
+
+    EXAMPLES:
+    =========
+    >>> rsystem = ReactionSystem(1000, 8.314, dbFile)
+    >>> rsystem.buildFromXml(xmlFile, np.ones(len(species)))
+    """
+    species = write_thermo(dbFile, num_species, source)
+    write_mechanism(xmlFile, species, num_reactions, reversible, rate_types, seed)
+    return species
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m chemkin_g10.generate",
+                                     description="Write a synthetic mechanism and its thermo database")
+    parser.add_argument("xml", help="the mechanism XML file to write")
+    parser.add_argument("db", help="the thermo database to write (.sqlite, .npy or .npz)")
+    parser.add_argument("--species", type=int, default=100, help="number of species (default 100)")
+    parser.add_argument("--reactions", type=int, default=1000, help="number of reactions (default 1000)")
+    parser.add_argument("--reversible", type=float, default=0.5,
+                        help="fraction of reversible reactions (default 0.5)")
+    parser.add_argument("--rate-types", nargs="+", default=list(RATE_TYPES), choices=RATE_TYPES,
+                        help="rate coefficient types to draw from (default: all)")
+    parser.add_argument("--seed", type=int, default=None, help="seed of the random generator")
+    parser.add_argument("--source", default=DEFAULT_DB, help="database the coefficients are drawn from")
+    args = parser.parse_args(argv)
+    generate(args.xml, args.db, args.species, args.reactions, args.reversible, args.rate_types, args.seed,
+             args.source)
+
+
+if __name__ == "__main__":
+    main()
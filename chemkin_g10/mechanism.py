@@ -0,0 +1,226 @@
+import functools
+import numpy as np
+from scipy import sparse
+
+
+class _lazy(functools.cached_property):
+    """A read-only MechanismPlan attribute that is only computed, and then
+       frozen, the first time it is used"""
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        value = super().__get__(instance, owner)
+        MechanismPlan._freeze(value)
+        return value
+
+
+def _columns(nu):
+    """The nonzero entries of a canonical CSC matrix or of a dense array,
+       column by column and in species order within a column: (columns,
+       species indices, values)"""
+    if sparse.issparse(nu):
+        return np.repeat(np.arange(nu.shape[1]), np.diff(nu.indptr)), nu.indices, nu.data
+    cols, rows = np.nonzero(np.transpose(nu))
+    return cols, rows, np.transpose(nu)[cols, rows]
+
+
+def _pad(num_species, num_columns, cols, rows, values):
+    """Turn nonzero entries sorted by column (see _columns) into padded
+       per-column lists of (species index, order) pairs"""
+    counts = np.bincount(cols, minlength=num_columns)
+    width = counts.max() if len(counts) else 0
+    idx = np.full((num_columns, width), num_species, dtype=np.intp)
+    order = np.zeros((num_columns, width))
+    slots = np.arange(len(cols)) - np.repeat(np.cumsum(counts) - counts, counts)
+    idx[cols, slots] = rows
+    order[cols, slots] = values
+    return idx, order
+
+
+def stoichiometry_lists(nu_react, nu_prod, reversibleFlagList):
+    """Validate stoichiometric coefficients and build the per-reaction lists
+       of a MechanismPlan, without any of its matrices
+
+    INPUTS:
+    =======
+    nu_react, nu_prod:
+                canonical CSC matrices (see MechanismPlan._compress) or dense
+                arrays of floats, size: num_species X num_reactions
+    reversibleFlagList:
+                array of booleans, size: num_reactions
+
+    RETURNS:
+    ========
+    lists: dict
+           reversible, reversible_idx, react_idx, react_ord, prod_idx and
+           prod_ord, as described in MechanismPlan
+    """
+    if nu_react.shape != nu_prod.shape:
+        raise ValueError("Reactant and product stoichiometric coefficients must have the same shape!")
+    num_species, num_reactions = nu_react.shape
+    entries = []
+    for nu_check in (nu_react, nu_prod):
+        cols, rows, values = _columns(nu_check)
+        if np.any(values < 0):
+            pos = np.argmax(values < 0)
+            raise ValueError("nu_{0}{1} = {2}:  Negative stoichiometric coefficients are prohibited!".format(
+                rows[pos], cols[pos], values[pos]))
+        entries.append((cols, rows, values))
+
+    reversible = np.asarray(reversibleFlagList, dtype=bool).reshape(-1)
+    if len(reversible) != num_reactions:
+        raise ValueError("Size of reversibleFlagList does not match to number of reactions!")
+    reversible_idx = np.flatnonzero(reversible)
+
+    react_idx, react_ord = _pad(num_species, num_reactions, *entries[0])
+    # the products of the reversible reactions only, one row per entry of
+    # reversible_idx
+    cols, rows, values = entries[1]
+    keep = reversible[cols]
+    prod_idx, prod_ord = _pad(num_species, len(reversible_idx), np.searchsorted(reversible_idx, cols[keep]),
+                              rows[keep], values[keep])
+    return dict(reversible=reversible,
+                reversible_idx=reversible_idx,
+                react_idx=react_idx,
+                react_ord=react_ord,
+                prod_idx=prod_idx,
+                prod_ord=prod_ord)
+
+
+class MechanismPlan:
+    """The class that represents the compiled, read-only stoichiometry of a
+       reaction system. Every rate, Jacobian and simulator routine works from
+       one of these, so their cost scales with the number of nonzero
+       stoichiometric coefficients rather than num_species X num_reactions.
+
+    Parameters
+    ----------
+    nu_react:   numpy array or scipy sparse matrix of floats,
+                size: num_species X num_reactions
+                stoichiometric coefficients for the reactants
+    nu_prod:    numpy array or scipy sparse matrix of floats,
+                size: num_species X num_reactions
+                stoichiometric coefficients for the products
+    reversibleFlagList:
+                array of booleans,
+                size: num_reactions
+                boolean indicator indicating wether each reaction is reversible
+
+    Attributes
+    ----------
+    nu_react, nu_prod, nu:
+                CSC matrices (num_species X num_reactions) of the reactant,
+                product and net (nu_prod - nu_react) coefficients
+    nu_react_dense, nu_prod_dense:
+                read-only dense arrays of nu_react and nu_prod
+                (computed on first use)
+    nu_csr:     CSR copy of nu, used for the species reaction rates
+                (computed on first use)
+    nu_rev:     CSC matrix of the net coefficients of the reversible reactions
+                (computed on first use)
+    reversible: boolean array, size: num_reactions
+    reversible_idx:
+                indices of the reversible reactions
+    react_idx, react_ord:
+                num_reactions X max_reactants arrays holding, for every
+                reaction, the species indices of its reactants and their
+                orders. Unused slots point to the extra species index
+                num_species with order 0.
+    prod_idx, prod_ord:
+                the same lists for the products of the reversible reactions,
+                one row per entry of reversible_idx
+    jac_pattern:
+                boolean CSR matrix (num_species X num_species), the sparsity
+                pattern of the Jacobian of the species reaction rates
+                (computed on first use)
+    """
+    def __init__(self, nu_react, nu_prod, reversibleFlagList):
+        nu_react = self._compress(nu_react)
+        nu_prod = self._compress(nu_prod)
+        values = stoichiometry_lists(nu_react, nu_prod, reversibleFlagList)
+
+        nu = (nu_prod - nu_react).tocsc()
+        nu.eliminate_zeros()
+        values.update(num_species=nu_react.shape[0],
+                      num_reactions=nu_react.shape[1],
+                      nu_react=nu_react,
+                      nu_prod=nu_prod,
+                      nu=nu)
+        for name, value in values.items():
+            self._freeze(value)
+            object.__setattr__(self, name, value)
+
+    @_lazy
+    def nu_react_dense(self):
+        return self.nu_react.toarray()
+
+    @_lazy
+    def nu_prod_dense(self):
+        return self.nu_prod.toarray()
+
+    @_lazy
+    def nu_csr(self):
+        return self.nu.tocsr()
+
+    @_lazy
+    def nu_rev(self):
+        return self.nu[:, self.reversible_idx].tocsc()
+
+    @_lazy
+    def jac_pattern(self):
+        # species l can affect species i through reaction j when l is a
+        # reactant of j (or a product of a reversible j) and nu_ij != 0
+        incidence = (self.nu_react + self.nu_prod.dot(sparse.diags(self.reversible.astype(float)))).T
+        return (abs(self.nu).dot(incidence) != 0).tocsr()
+
+    @staticmethod
+    def _compress(nu):
+        """Return nu as a canonical CSC matrix without explicit zeros"""
+        nu = sparse.csc_matrix(nu, dtype=float, copy=True)
+        nu.sum_duplicates()
+        nu.eliminate_zeros()
+        nu.sort_indices()
+        return nu
+
+    @staticmethod
+    def _freeze(value):
+        if isinstance(value, np.ndarray):
+            value.flags.writeable = False
+        elif sparse.issparse(value):
+            for arr in (value.data, value.indices, value.indptr):
+                arr.flags.writeable = False
+
+    def __setstate__(self, state):
+        # unpickled arrays come back writeable
+        for name, value in state.items():
+            self._freeze(value)
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("MechanismPlan is immutable, compile a new plan instead.")
+
+    def __delattr__(self, name):
+        raise AttributeError("MechanismPlan is immutable, compile a new plan instead.")
+
+    def reactants(self, index):
+        """Return the reactants of one reaction
+
+        INPUTS:
+        =======
+        index: int
+               the index of the reaction
+
+        RETURNS:
+        ========
+        (species indices, orders) of the reactants
+        """
+        used = self.react_idx[index] < self.num_species
+        return self.react_idx[index][used], self.react_ord[index][used]
+
+    def __len__(self):
+        return self.num_reactions
+
+    def __str__(self):
+        return "MechanismPlan: {} species, {} reactions ({} reversible), {} nonzero coefficients".format(
+            self.num_species, self.num_reactions, len(self.reversible_idx),
+            self.nu_react.nnz + self.nu_prod.nnz)
@@ -0,0 +1,104 @@
+import contextlib
+from time import perf_counter
+
+# shared do-nothing context of disabled profiling
+_NULL = contextlib.nullcontext()
+
+
+class Profiler:
+    """The class that counts and times the expensive steps of a
+       ReactionSystem and a Simulator: XML parsing, database queries,
+       backward coefficient evaluations and, during solveODE, every
+       right-hand side and Jacobian evaluation of the solver.
+
+       Profiling is opt-in: pass a Profiler to ReactionSystem (or Simulator).
+       Without one, nothing is wrapped and the only cost left is a None check
+       outside the solver loop.
+
+    EXAMPLES:
+    =========
+    >>> profiler = Profiler()
+    >>> rsystem = ReactionSystem(900, 8.314, dbFile, profiler=profiler)
+    >>> rsystem.buildFromXml(xmlFile, concs)
+    >>> Simulator(rsystem, 0.05).solveODE()
+    >>> sorted(profiler.report())
+    ['backward_coeffs', 'db_query', 'equilibrium_diff', 'integrate', 'jacobian', 'parse', 'rhs', 'solver']
+    >>> profiler.report()["parse"]["calls"]
+    1
+    """
+    def __init__(self):
+        # name -> [calls, seconds]
+        self.stats = {}
+        # statistics reported by the ODE solver of the last solveODE
+        self.solver = None
+
+    def _stat(self, name):
+        return self.stats.setdefault(name, [0, 0.0])
+
+    def add(self, name, seconds, calls=1):
+        """Record calls to name that took seconds in total"""
+        stat = self._stat(name)
+        stat[0] += calls
+        stat[1] += seconds
+
+    @contextlib.contextmanager
+    def timer(self, name):
+        """Context manager timing one call to name"""
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, perf_counter() - start)
+
+    def wrap(self, name, func):
+        """Return func, counting and timing every call to it under name"""
+        stat = self._stat(name)
+
+        def timed(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                stat[0] += 1
+                stat[1] += perf_counter() - start
+        return timed
+
+    def reset(self):
+        """Forget everything recorded so far"""
+        self.stats.clear()
+        self.solver = None
+
+    def report(self):
+        """Return what was recorded
+
+        RETURNS:
+        ========
+        report: dict
+                name -> {'calls': int, 'time': seconds} for every step, and
+                'solver' -> the solver statistics of the last solveODE (see
+                Simulator.solver_stats) once there is one
+        """
+        report = {name: dict(calls=calls, time=seconds) for name, (calls, seconds) in self.stats.items()}
+        if self.solver is not None:
+            report['solver'] = dict(self.solver)
+        return report
+
+    def __str__(self):
+        lines = ["{:<20s} {:>10s} {:>12s}".format("step", "calls", "time (s)")]
+        for name, (calls, seconds) in sorted(self.stats.items()):
+            lines.append("{:<20s} {:>10d} {:>12.6f}".format(name, calls, seconds))
+        if self.solver is not None:
+            lines.append("solver: " + ", ".join("{}={}".format(key, val) for key, val in self.solver.items()))
+        return "\n".join(lines)
+
+
+def timer(profiler, name):
+    """Return a context manager timing name on profiler, or one doing nothing
+       when profiler is None"""
+    return _NULL if profiler is None else profiler.timer(name)
+
+
+def wrap(profiler, name, func):
+    """Return func timed under name on profiler, or func itself when profiler
+       is None"""
+    return func if profiler is None else profiler.wrap(name, func)
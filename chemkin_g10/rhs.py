@@ -0,0 +1,85 @@
+import numpy as np
+
+
+class ReactionRateRHS:
+    """The class that evaluates the right-hand side of the kinetics ODE,
+       d concs / dt = nu . progress_rate(concs), without allocating memory.
+
+       Every scratch array is created once, when the object is built, and the
+       evaluation runs in place through the out= argument of the ufuncs. The
+       temperature stays constant during a solve, so k and kb are copied in
+       once as well.
+
+    Parameters
+    ----------
+    plan:   chemkin_g10.mechanism.MechanismPlan
+            compiled stoichiometry of the system
+    k:      numpy array of floats, size: num_reactions
+            forward reaction rate coefficients
+    kb:     numpy array of floats, size: num_reactions
+            backward reaction rate coefficients (only read for reversible reactions)
+
+    Notes
+    -----
+    The arrays returned by progress_rate and __call__ are work buffers,
+    overwritten by the next call; copy them to keep the values.
+    """
+    def __init__(self, plan, k, kb):
+        self.plan = plan
+        # np.take and np.put copy read-only or non-intp index arrays on
+        # every call, so keep private writeable copies of the plan's indices
+        self.rev = np.array(plan.reversible_idx, dtype=np.intp)
+        self.react_idx = np.array(plan.react_idx, dtype=np.intp)
+        self.prod_idx = np.array(plan.prod_idx, dtype=np.intp)
+        self.nu_indices = np.array(plan.nu_csr.indices, dtype=np.intp)
+        self.k = np.array(k, dtype=float)
+        self.kb_rev = np.array(kb, dtype=float)[self.rev]
+
+        # concentrations plus the extra species of the padded slots, always 1
+        self.concs = np.ones(plan.num_species + 1)
+        self.react_terms = np.empty(plan.react_idx.shape)
+        self.prod_terms = np.empty(plan.prod_idx.shape)
+        self.backward = np.empty(len(self.rev))
+        self.forward_rev = np.empty(len(self.rev))
+        self.progress = np.empty(plan.num_reactions)
+
+        # species rates as segmented sums over the rows of nu (CSR), only
+        # for the species that take part in some reaction
+        nu = plan.nu_csr
+        self.species = np.flatnonzero(np.diff(nu.indptr))
+        self.starts = np.array(nu.indptr[self.species], dtype=np.intp)
+        self.terms = np.empty(nu.nnz)
+        self.row_sums = np.empty(len(self.species))
+        self.out = np.zeros(plan.num_species)
+
+    def progress_rate(self, concs):
+        """Return the progress rate of every reaction, size: num_reactions"""
+        plan = self.plan
+        self.concs[:-1] = concs
+        np.take(self.concs, self.react_idx, out=self.react_terms, mode='clip')
+        np.power(self.react_terms, plan.react_ord, out=self.react_terms)
+        np.prod(self.react_terms, axis=1, out=self.progress)
+        np.multiply(self.progress, self.k, out=self.progress)
+        if len(self.rev):
+            np.take(self.concs, self.prod_idx, out=self.prod_terms, mode='clip')
+            np.power(self.prod_terms, plan.prod_ord, out=self.prod_terms)
+            np.prod(self.prod_terms, axis=1, out=self.backward)
+            np.multiply(self.backward, self.kb_rev, out=self.backward)
+            np.take(self.progress, self.rev, out=self.forward_rev, mode='clip')
+            np.subtract(self.forward_rev, self.backward, out=self.forward_rev)
+            np.put(self.progress, self.rev, self.forward_rev, mode='clip')
+        return self.progress
+
+    def __call__(self, concs, t=None):
+        """Return the reaction rate of every species, size: num_species.
+           t is accepted (and ignored) so the object can be handed to odeint
+           directly.
+        """
+        progress = self.progress_rate(concs)
+        nu = self.plan.nu_csr
+        np.take(progress, self.nu_indices, out=self.terms, mode='clip')
+        np.multiply(self.terms, nu.data, out=self.terms)
+        if len(self.species):
+            np.add.reduceat(self.terms, self.starts, out=self.row_sums)
+            np.put(self.out, self.species, self.row_sums, mode='clip')
+        return self.out
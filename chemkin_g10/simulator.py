@@ -1,6 +1,9 @@
 import numpy as np
+from pathlib import Path
 import chemkin_g10.computation as cp
-from scipy.integrate import odeint
+from chemkin_g10 import backend, profiling
+from chemkin_g10.energy import EnergyRHS
+from scipy.integrate import odeint, solve_ivp
 import matplotlib.pyplot as plt
 import requests
 import json
@@ -8,14 +11,130 @@ import webbrowser
 
 class Simulator:
     """This class represents a simulator for a system of reversible reactions.
-    """
 
-    def __init__(self, rsystem, maxTime, numSample=100, timeScale=1e9, eqThreshold=1e-05):
+    Parameters
+    ----------
+    rsystem:    chemkin_g10.chemkin.ReactionSystem
+                the reaction system to simulate
+    maxTime:    float
+                end time of the simulation (in units of 1/timeScale seconds)
+    numSample:  int, default value = 100
+                number of output time points, independent of the solver steps
+    sampling:   str, default value = "linear"
+                how the output times are placed over the horizon:
+                "linear":   evenly spaced
+                "log":      0, then log-spaced from logStart to maxTime, so the
+                            initial transient gets as many points per decade
+                            as the tail
+                "adaptive": the system is solved first, then numSample times
+                            are spread evenly along the (normalized)
+                            concentration trajectory and interpolated from
+                            the solver's dense output, so they gather where
+                            concentrations change
+                "steps":    only the times of the solver's own steps
+                            (numSample is ignored)
+                "adaptive" and "steps" use the dense output of solve_ivp
+                (LSODA when solver is "odeint"); they can't be combined
+                with outputDir or stopAtEquilibrium.
+    logStart:   float, default value = None
+                first nonzero output time of "log" sampling, in the units of
+                maxTime (default maxTime * 1e-6)
+    adiabatic:  bool, default value = False
+                integrate the temperature along with the concentrations, as
+                an adiabatic constant-volume reactor (see energy.EnergyRHS),
+                starting from rsystem.T; k, kb and the NASA coefficients then
+                follow T at every step. The temperatures at tout are kept in
+                Tout. The solver estimates the Jacobian by finite differences,
+                and "odeint" runs as the LSODA method of solve_ivp. Can't be
+                combined with outputDir or stopAtEquilibrium.
+    timeScale:  float, default value = 1e9
+    eqThreshold: float, default value = 1e-05
+    analyticJacobian:
+                bool, default value = True
+                pass the analytic Jacobian to the solver instead of letting it
+                estimate one by finite differences
+    solver:     str, default value = "odeint"
+                "odeint", or one of the solve_ivp methods "BDF", "Radau", "LSODA"
+    denseOutput: bool, default value = False
+                keep the solve_ivp continuous solution in self.sol
+    rtol, atol: float, default value = 1.49012e-8
+                tolerances of the solver (the odeint defaults)
+    profiler:   chemkin_g10.profiling.Profiler, default value = None
+                counts and times the right-hand side and Jacobian evaluations
+                of the solver and receives its statistics; defaults to the
+                profiler of rsystem. None there too disables profiling.
+    outputDir:  str, default value = None
+                stream the trajectory to this directory instead of keeping it
+                in memory: the solver runs chunkSize output times at a time
+                and every chunk is written to yout.npy and eq_diff.npy (and
+                the times to tout.npy) as soon as it is solved. yout, tout
+                and eq_diff are then read-only memory-mapped arrays.
+    stopAtEquilibrium:
+                bool, default value = False
+                stop integrating at the first output time where every
+                reversible reaction is within eqThreshold of equilibrium, or
+                once no concentration has moved faster than the slope limit
+                of equilibrium_graph over SLOPE_CHUNKS chunks in a row. The system is solved chunkSize
+                output times at a time and checked after every chunk; the
+                outputs end at the stop time.
+    chunkSize:  int, default value = None
+                number of output times integrated at once when streaming or
+                stopping at equilibrium (default 10 when stopping at
+                equilibrium, 1000 otherwise)
+
+    After solveODE, solver_stats holds the statistics reported by the
+    solver: number of steps, of right-hand side (nfe) and Jacobian (nje)
+    evaluations, and for odeint the number of switches between its non-stiff
+    (adams) and stiff (bdf) methods. Tout holds the temperature at every
+    output time (constant unless adiabatic). stop_time is the last time solved
+    and stop_reason why the solve ended before maxTime: "equilibrium", "slope",
+    or None when it did not.
+    """
+    SOLVERS = ("odeint", "BDF", "Radau", "LSODA")
+    SAMPLINGS = ("linear", "log", "adaptive", "steps")
+    # chunks in a row that must satisfy the slope limit before stopping on it
+    SLOPE_CHUNKS = 3
+
+    def __init__(self, rsystem, maxTime, numSample=100, timeScale=1e9, eqThreshold=1e-05, analyticJacobian=True,
+                 solver="odeint", denseOutput=False, rtol=1.49012e-8, atol=1.49012e-8, profiler=None,
+                 outputDir=None, stopAtEquilibrium=False, chunkSize=None, sampling="linear", logStart=None,
+                 adiabatic=False):
+        if np.ndim(rsystem.T) != 0 or np.ndim(rsystem.concs) != 1:
+            raise ValueError("The simulator needs a single temperature and concentration set!")
+        if solver not in self.SOLVERS:
+            raise ValueError("Unknown solver {}, must be one of {}!".format(solver, ", ".join(self.SOLVERS)))
+        if outputDir is not None and denseOutput:
+            raise ValueError("The dense output of a streamed solve would only cover its last chunk!")
+        if sampling not in self.SAMPLINGS:
+            raise ValueError("Unknown sampling {}, must be one of {}!".format(sampling, ", ".join(self.SAMPLINGS)))
+        if sampling in ("adaptive", "steps") and (outputDir is not None or stopAtEquilibrium):
+            raise ValueError("{} sampling needs the whole solution first, it can't be streamed "
+                             "or stopped early!".format(sampling))
+        if adiabatic and (outputDir is not None or stopAtEquilibrium):
+            raise ValueError("An adiabatic solve can't be streamed or stopped early!")
+        if logStart is not None and not 0 < logStart < maxTime:
+            raise ValueError("logStart must be between 0 and maxTime!")
+        if chunkSize is None:
+            chunkSize = 10 if stopAtEquilibrium else 1000
+        if chunkSize < 1:
+            raise ValueError("chunkSize must be positive!")
         self.rsystem = rsystem
         self.maxTime = maxTime
         self.numSample = numSample
         self.timeScale = timeScale
         self.eqThreshold = eqThreshold
+        self.analyticJacobian = analyticJacobian
+        self.solver = solver
+        self.denseOutput = denseOutput
+        self.rtol = rtol
+        self.atol = atol
+        self.profiler = rsystem.profiler if profiler is None else profiler
+        self.outputDir = outputDir
+        self.stopAtEquilibrium = stopAtEquilibrium
+        self.chunkSize = chunkSize
+        self.sampling = sampling
+        self.logStart = logStart
+        self.adiabatic = adiabatic
 
     def solveODE(self):
         """Solve the ODE
@@ -25,49 +144,359 @@ class Simulator:
             total time of simulation
 
         """
-        def fun(concs, t):
-            nu = self.rsystem.nu_prod - self.rsystem.nu_react
-            rj = cp.progress_rate(self.rsystem.nu_react, self.rsystem.nu_prod, self.rsystem.k, concs, self.rsystem.T, self.rsystem.a,
-                                  self.rsystem.reversibleFlagList, solvingODE=True)
-            return np.dot(nu, rj)
-
-        tout = np.linspace(0, self.maxTime/self.timeScale, self.numSample)
+        self.stop_time = self.maxTime/self.timeScale
+        self.stop_reason = None
+        # rate parameters and NASA coefficients of both ranges, for every T
+        self._energy = EnergyRHS(self.rsystem) if self.adiabatic else None
+        if self.sampling in ("adaptive", "steps"):
+            return self._solveDense()
+        tout = self._outputTimes()
+        if self.outputDir is not None or self.stopAtEquilibrium:
+            return self._solveChunked(tout)
 
         try:
-            self.yout = odeint(fun, self.rsystem.concs, tout)
-            self.tout = tout
+            with profiling.timer(self.profiler, 'integrate'):
+                yout = self._integrate(tout, self._initialState())
         except ValueError:
             print("ODE solver aborted!")
             raise
-        if len(self.yout) != self.numSample:
+        if len(yout) != self.numSample:
             raise ValueError("Invalid yout!")
+        self._setOutputs(tout, yout)
+
+    def _initialState(self):
+        """The concentrations, followed by T when adiabatic"""
+        concs = np.asarray(self.rsystem.concs, dtype=float)
+        if self.adiabatic:
+            return np.append(concs, float(self.rsystem.T))
+        return concs
+
+    def _outputTimes(self):
+        """Return the "linear" or "log" output times, in seconds"""
+        t_end = self.maxTime/self.timeScale
+        if self.sampling == "linear":
+            return np.linspace(0, t_end, self.numSample)
+        first = (self.maxTime * 1e-6 if self.logStart is None else self.logStart)/self.timeScale
+        return np.concatenate([[0.0], np.geomspace(first, t_end, self.numSample - 1)])
+
+    def _setOutputs(self, tout, yout):
+        """Keep a solved trajectory (the states of _initialState at every
+           output time) and find the equilibrium times of its reactions"""
+        if self.adiabatic:
+            yout, Tout = yout[:, :-1], yout[:, -1]
+        else:
+            Tout = np.full(len(tout), float(self.rsystem.T))
+        # relative gap between reaction quotient and equilibrium constant,
+        # for every output time and reaction at once
+        with profiling.timer(self.profiler, 'equilibrium_diff'):
+            eq_diff = self._equilibrium_diff(yout, Tout)
+        eq_diff[0] = 0 # there's no product at the beginning
+
+        self.tout = tout
+        self.yout = yout
+        self.Tout = Tout
+        self.eq_point = np.full(self.rsystem.plan.num_reactions, -1.0)
+        self._updateEqPoint(eq_diff[1:], tout[1:])
+        self.eq_diff = eq_diff
 
-        # get equilibrium point for each time point
-        eq_point = [-1 for i in range(len(self.rsystem))]
-        eq_diff = [[0 for j in range(len(self.rsystem))] for i in range(self.numSample)]
-        eq_constant = self.rsystem.equilibrium_constant
-
-        for i, concs in enumerate(self.yout):
-            if i == 0: continue # there's no product at the beginning
-            current_concs = concs.reshape(len(self.rsystem.species), 1)
-            reaction_quotient = np.product(current_concs ** self.rsystem.nu_prod, axis=0) / np.product(current_concs ** self.rsystem.nu_react, axis=0)
-
-            for j, rq in enumerate(reaction_quotient):
-                if not self.rsystem.reversibleFlagList[j]:
-                    continue
-
-                eq_diff[i][j] = abs(rq - eq_constant[j]) / eq_constant[j]
+    def _solveDense(self):
+        """solveODE for the "adaptive" and "steps" samplings: one solve over
+           the whole horizon with dense output, sampled afterwards"""
+        method = self._ivpMethod()
+        concs = self._initialState()
+        try:
+            with profiling.timer(self.profiler, 'integrate'):
+                res = self._solveIvp(method, (0.0, self.stop_time), concs, None, True)
+            if not res.success:
+                raise ValueError(res.message)
+        except ValueError:
+            print("ODE solver aborted!")
+            raise
+        self.sol = res.sol
+        if self.sampling == "steps":
+            self._setOutputs(res.t, res.y.T)
+            return
+        tout = self._adaptiveTimes(res.t, res.y)
+        yout = res.sol(tout).T
+        yout[0] = concs
+        self._setOutputs(tout, yout)
+
+    def _adaptiveTimes(self, t, y):
+        """Return numSample times spread evenly along the trajectory y(t)
+           (num_species X num_steps) of the solver, each concentration being
+           scaled by its largest value. A tenth of the points follow the
+           time axis, so that flat stretches are not left empty.
+        """
+        scale = np.abs(y).max(axis=1)
+        scale[scale == 0] = 1.0
+        length = np.concatenate([[0.0], np.cumsum(np.linalg.norm(np.diff(y / scale[:, np.newaxis], axis=1), axis=0))])
+        measure = 0.1 * t / t[-1]
+        if length[-1] > 0:
+            measure += 0.9 * length / length[-1]
+        else:
+            measure *= 10
+        tout = np.interp(np.linspace(0, measure[-1], self.numSample), measure, t)
+        tout[0], tout[-1] = t[0], t[-1]
+        return tout
+
+    def interpolate(self, t):
+        """Return the concentrations at any times of the horizon, from the
+           dense output of the last solve
 
-                if eq_point[j] != -1:
-                    continue
+        INPUTS:
+        =======
+        t: float, or array of floats (in seconds, like tout)
 
-                if eq_diff[i][j] < self.eqThreshold:
-                    eq_point[j] = self.tout[i]
-                    # eq_point[j] = i
+        RETURNS:
+        ========
+        concs: numpy array, num_species (num_times X num_species), with T as
+               an extra last column when adiabatic
+        """
+        if getattr(self, 'sol', None) is None:
+            raise ValueError("No dense output: use a solve_ivp solver with denseOutput=True, "
+                             "or the adaptive or steps sampling!")
+        return self.sol(t).T
+
+    def _solveChunked(self, tout):
+        """solveODE, chunkSize output times at a time. Every chunk goes to
+           the .npy files of outputDir (if any) before the next one is solved,
+           and with stopAtEquilibrium the solve ends at the first chunk that
+           reaches equilibrium.
+        """
+        plan = self.rsystem.plan
+        shapes = [(len(tout), plan.num_species), (len(tout), plan.num_reactions)]
+        if self.outputDir is None:
+            yout, eq_diff = [np.empty(shape) for shape in shapes]
+        else:
+            out = Path(self.outputDir)
+            out.mkdir(parents=True, exist_ok=True)
+            yout, eq_diff = [np.lib.format.open_memmap(out / name, mode="w+", shape=shape)
+                             for name, shape in zip(("yout.npy", "eq_diff.npy"), shapes)]
+
+        concs = np.asarray(self.rsystem.concs, dtype=float)
+        yout[0] = concs
+        eq_diff[0] = 0 # there's no product at the beginning
+        self.eq_point = np.full(plan.num_reactions, -1.0)
+        # output rows in a row under the slope limit, up to the last chunk
+        self._slopeRun = 0
+        total = None
+        solved = 1
+        while solved < len(tout) and self.stop_reason is None:
+            start, stop = solved, min(solved + self.chunkSize, len(tout))
+            # every chunk starts from the last state of the previous one
+            try:
+                with profiling.timer(self.profiler, 'integrate'):
+                    rows = self._integrate(tout[start - 1:stop], concs)
+            except ValueError:
+                print("ODE solver aborted!")
+                raise
+            if len(rows) != stop - start + 1:
+                raise ValueError("Invalid yout!")
+            total = self._addSolverStats(total, self.solver_stats)
+
+            with profiling.timer(self.profiler, 'equilibrium_diff'):
+                diff = self._equilibrium_diff(rows[1:])
+            if self.stopAtEquilibrium:
+                stop = start + self._equilibriumRows(rows, diff, tout[start - 1:stop])
+                rows, diff = rows[:stop - start + 1], diff[:stop - start]
+            yout[start:stop] = rows[1:]
+            eq_diff[start:stop] = diff
+            self._updateEqPoint(diff, tout[start:stop])
+            concs = rows[-1]
+            solved = stop
+        if total is not None:
+            self._setSolverStats(total)
+        self.stop_time = tout[solved - 1]
+        self.Tout = np.full(solved, float(self.rsystem.T))
+
+        if self.outputDir is None:
+            self.tout, self.yout, self.eq_diff = tout[:solved], yout[:solved], eq_diff[:solved]
+            return
+        yout.flush()
+        eq_diff.flush()
+        del yout, eq_diff
+        # the rows past the stop time stay in the files, zeroed; tout.npy
+        # holds the times actually solved
+        np.save(out / "tout.npy", tout[:solved])
+        self.tout = np.load(out / "tout.npy", mmap_mode="r")
+        self.yout = np.load(out / "yout.npy", mmap_mode="r")[:solved]
+        self.eq_diff = np.load(out / "eq_diff.npy", mmap_mode="r")[:solved]
+
+    def _equilibriumRows(self, rows, diff, times):
+        """Return how many rows of a chunk to keep: all of them, or up to the
+           first one at equilibrium, in which case stop_reason is set.
+
+           A flat row alone is not enough to stop on the slope limit, an
+           induction period before ignition is just as flat: the slopes must
+           stay under the limit for SLOPE_CHUNKS chunks in a row.
 
-        self.eq_point = eq_point
-        self.eq_diff = eq_diff
-        return
+        INPUTS:
+        =======
+        rows:  the solved chunk, its first row being the previous output
+        diff:  the equilibrium gaps of rows[1:]
+        times: the output times of rows
+        """
+        plan = self.rsystem.plan
+        rev = plan.reversible_idx
+        at_eq = np.zeros(len(diff), dtype=bool)
+        if len(rev):
+            at_eq = np.all(diff[:, rev] < self.eqThreshold, axis=1)
+        # the slope limit of equilibrium_graph, on the absolute slopes
+        slope = np.abs(np.diff(rows, axis=0)) / np.diff(times)[:, np.newaxis]
+        critical_slope = rows[1:].max(axis=1) / self.stop_time * 1e-07
+        below = np.all(slope < critical_slope[:, np.newaxis], axis=1)
+        # length of the run of flat rows ending at every row, carried over
+        # from the previous chunks
+        index = np.arange(len(below))
+        last_break = np.maximum.accumulate(np.where(below, -1, index))
+        run = np.where(last_break >= 0, index - last_break, self._slopeRun + index + 1)
+        flat = run >= self.SLOPE_CHUNKS * self.chunkSize
+        done = at_eq | flat
+        if not done.any():
+            self._slopeRun = run[-1]
+            return len(diff)
+        first = np.argmax(done)
+        self.stop_reason = "equilibrium" if at_eq[first] else "slope"
+        return first + 1
+
+    @staticmethod
+    def _addSolverStats(total, stats):
+        """Add up the solver statistics of consecutive chunks"""
+        if total is None:
+            return dict(stats)
+        total = dict(total)
+        for key in ("steps", "nfe", "nje", "method_switches"):
+            if total[key] is not None:
+                total[key] += stats[key]
+        total["method"] = stats["method"]
+        total["message"] = stats["message"]
+        return total
+
+    def _updateEqPoint(self, eq_diff, tout):
+        """Set eq_point of the reversible reactions that first come within the
+           threshold at one of these output times"""
+        reached = eq_diff < self.eqThreshold
+        reached[:, ~self.rsystem.plan.reversible] = False
+        new = reached.any(axis=0) & (self.eq_point == -1)
+        self.eq_point[new] = tout[np.argmax(reached, axis=0)[new]]
+
+    def _equilibrium_diff(self, yout, Tout=None):
+        """Return |Q - Ke| / Ke for every row of yout (num_times X num_reactions),
+           0 for irreversible reactions. Ke is taken at the temperatures
+           Tout of the rows when adiabatic, at rsystem.T otherwise.
+        """
+        plan = self.rsystem.plan
+        eq_diff = np.zeros((len(yout), plan.num_reactions))
+        rev = plan.reversible_idx
+        if len(rev):
+            log_q, sign = cp.plan_log_reaction_quotient(plan, yout)
+            if self.adiabatic:
+                energy = self._energy
+                ke = cp.plan_equilibrium_constant(plan, energy.rate_coeffs(Tout), Tout, energy.coeffs(Tout))
+                log_ke = np.log(ke[:, rev])
+            else:
+                log_ke = np.log(self.rsystem.equilibrium_constant[rev])
+            with np.errstate(over='ignore', invalid='ignore'):
+                eq_diff[:, rev] = np.abs(sign[:, rev] * np.exp(log_q[:, rev] - log_ke) - 1.0)
+        return eq_diff
+
+    def _integrate(self, tout, concs):
+        """Integrate the system with the selected backend from concs at
+           tout[0] and return the concentrations at the times in tout
+           (num_times X num_species)
+        """
+        if self.solver != "odeint" or self.adiabatic:
+            res = self._solveIvp(self._ivpMethod(), (tout[0], tout[-1]), concs, tout, self.denseOutput)
+            if not res.success:
+                raise ValueError(res.message)
+            self.sol = res.sol
+            return res.y.T
+
+        kb = self.rsystem.updateBackwardCoeffs()
+        plan = self.rsystem.plan
+        k = self.rsystem.k
+
+        # preallocated right-hand side, compiled when numba is available;
+        # T (so k and kb) is fixed
+        rhs = profiling.wrap(self.profiler, 'rhs', backend.make_rhs(plan, k, kb))
+
+        def jac(concs, t):
+            return backend.jacobian(plan, k, kb, concs)
+
+        self.sol = None
+        # odeint copies the result out of the work buffer of rhs
+        yout, info = odeint(rhs, concs, tout,
+                            Dfun=profiling.wrap(self.profiler, 'jacobian', jac) if self.analyticJacobian else None,
+                            rtol=self.rtol, atol=self.atol, full_output=True)
+        self._setSolverStats(self._odeintStats(info))
+        return yout
+
+    def _ivpMethod(self):
+        """The solve_ivp method of the solver, LSODA (the method of odeint)
+           standing in for odeint"""
+        return "LSODA" if self.solver == "odeint" else self.solver
+
+    def _solveIvp(self, method, t_span, concs, t_eval, dense):
+        """Run solve_ivp with the given method and return its result. The
+           right-hand side is the preallocated (compiled when numba is
+           available) one of backend for the fixed T, or the EnergyRHS of an
+           adiabatic solve.
+        """
+        plan = self.rsystem.plan
+        k = self.rsystem.k
+        kb = self.rsystem.updateBackwardCoeffs()
+        if self.adiabatic:
+            rhs = profiling.wrap(self.profiler, 'rhs', self._energy)
+        else:
+            rhs = profiling.wrap(self.profiler, 'rhs', backend.make_rhs(plan, k, kb))
+
+        def fun(t, concs):
+            # solve_ivp methods keep references to earlier results
+            return rhs(concs).copy()
+
+        # LSODA only takes dense Jacobians and has no use for a sparsity pattern
+        options = dict()
+        if self.adiabatic:
+            if method != "LSODA":
+                options["jac_sparsity"] = self._energy.jac_pattern()
+        elif self.analyticJacobian:
+            if method == "LSODA":
+                jac = lambda t, concs: backend.jacobian(plan, k, kb, concs)
+            else:
+                jac = lambda t, concs: cp.plan_jacobian(plan, k, kb, concs, sparse_output=True)
+            options["jac"] = profiling.wrap(self.profiler, 'jacobian', jac)
+        elif method != "LSODA":
+            options["jac_sparsity"] = plan.jac_pattern
+
+        res = solve_ivp(fun, t_span, concs, method=method, t_eval=t_eval, dense_output=dense,
+                        rtol=self.rtol, atol=self.atol, **options)
+        # solve_ivp reports no step count when t_eval is given
+        self._setSolverStats(dict(solver=method, steps=None if t_eval is not None else len(res.t) - 1,
+                                  nfe=int(res.nfev), nje=int(res.njev), method_switches=None, method=None,
+                                  message=res.message))
+        return res
+
+    @staticmethod
+    def _odeintStats(info):
+        """Summarize the full_output infodict of odeint, whose entries are
+           cumulative counts at every output time"""
+        if len(info['nst']) == 0:
+            return dict(solver="odeint", steps=0, nfe=0, nje=0, method_switches=0, method=None,
+                        message=info['message'])
+        # mused: 1 for adams (non-stiff), 2 for bdf (stiff)
+        used = info['mused']
+        return dict(solver="odeint",
+                    steps=int(info['nst'][-1]),
+                    nfe=int(info['nfe'][-1]),
+                    nje=int(info['nje'][-1]),
+                    method_switches=int(np.count_nonzero(np.diff(used))),
+                    method="bdf" if used[-1] == 2 else "adams",
+                    message=info['message'])
+
+    def _setSolverStats(self, stats):
+        self.solver_stats = stats
+        if self.profiler is not None:
+            self.profiler.solver = stats
 
     def check_equilibrium(self, index, t):
         """Check if the reaction system has reached equilibrium, by comparing
@@ -104,7 +533,12 @@ class Simulator:
         """
         if not hasattr(self, 'yout'):
             raise ValueError("Please solve ODE first!")
-        slope_diff = (self.yout[-1] - self.yout[-2])/(self.tout[-1]/len(self.tout))
+        if self.sampling == "linear":
+            # the original step estimate, kept so linear results don't change
+            slope_diff = (self.yout[-1] - self.yout[-2])/(self.tout[-1]/len(self.tout))
+        else:
+            # the output times are not evenly spaced, use the last interval
+            slope_diff = (self.yout[-1] - self.yout[-2])/(self.tout[-1] - self.tout[-2])
 
         critical_slope = max(self.yout[-1])/(self.tout[-1])*1e-07
         return all(s < critical_slope for s in slope_diff)
@@ -133,7 +567,7 @@ class Simulator:
         if species not in self.rsystem.species:
             raise ValueError("Please provide a valid species!")
         index = self.rsystem.species.index(species)
-        out = np.transpose(self.yout)[index]
+        out = self.yout[:, index]
         plt.plot(self.tout, out, label = self.rsystem.species[index])
         plt.legend()
         plt.show()
@@ -1,4 +1,21 @@
 import numpy as np
+from scipy import sparse
+
+def _species_axis(T):
+    """Append an axis to an array of temperatures so it broadcasts over species"""
+    if np.ndim(T) == 0:
+        return T
+    return np.asarray(T, dtype=float)[..., np.newaxis]
+
+def Cp_over_R(T, a):
+
+    # Same coefficient layout as H_over_RT: a is num_species X 7, or
+    # num_T X num_species X 7 for an array T.
+    T = _species_axis(T)
+    Cp_R = (a[...,0] + a[...,1] * T + a[...,2] * T**2.0
+            + a[...,3] * T**3.0 + a[...,4] * T**4.0)
+
+    return Cp_R
 
 def H_over_RT(T, a):
 
@@ -6,9 +23,11 @@ def H_over_RT(T, a):
     # Be careful to get the correct coefficients for the appropriate 
     # temperature range.  That is, for T <= Tmid get the low temperature 
     # range coeffs and for T > Tmid get the high temperature range coeffs.
-    H_RT = (a[:,0] + a[:,1] * T / 2.0 + a[:,2] * T**2.0 / 3.0 
-            + a[:,3] * T**3.0 / 4.0 + a[:,4] * T**4.0 / 5.0 
-            + a[:,5] / T)
+    # An array T (num_T) comes with a of size num_T X num_species X 7.
+    T = _species_axis(T)
+    H_RT = (a[...,0] + a[...,1] * T / 2.0 + a[...,2] * T**2.0 / 3.0 
+            + a[...,3] * T**3.0 / 4.0 + a[...,4] * T**4.0 / 5.0 
+            + a[...,5] / T)
 
     return H_RT
            
@@ -18,26 +37,55 @@ def S_over_R(T, a):
     # Be careful to get the correct coefficients for the appropriate 
     # temperature range.  That is, for T <= Tmid get the low temperature 
     # range coeffs and for T > Tmid get the high temperature range coeffs.
-    S_R = (a[:,0] * np.log(T) + a[:,1] * T + a[:,2] * T**2.0 / 2.0 
-           + a[:,3] * T**3.0 / 3.0 + a[:,4] * T**4.0 / 4.0 + a[:,6])
+    T = _species_axis(T)
+    S_R = (a[...,0] * np.log(T) + a[...,1] * T + a[...,2] * T**2.0 / 2.0 
+           + a[...,3] * T**3.0 / 3.0 + a[...,4] * T**4.0 / 4.0 + a[...,6])
 
     return S_R
 
-def backward_coeffs(kf, nu, T, a, p0=100000, R=8.3144598):
+def equilibrium_coeffs(nu, T, a, p0=100000, R=8.3144598):
+    """Returns the equilibrium constants of a set of reactions
+
+    H/RT and S/R are evaluated once for all species, and the changes over
+    every reaction are taken with a single product against nu.
 
+    INPUTS:
+    =======
+    nu:  numpy array of floats,
+         size: num_species X num_reactions
+         net stoichiometric coefficients (nu_prod - nu_react)
+    T:   float, or numpy array of floats
+         Temperature(s)
+    a:   numpy array of floats,
+         size: num_species X 7, or num_T X num_species X 7
+         nasa coefficients of each species
+    p0:  float, default value = 100000
+         pressure of the reactor
+    R:   float, default value = 8.3144598
+         Ideal gas constant
+
+    RETURNS:
+    ========
+    ke: numpy array of floats
+        size: num_reactions, or num_T X num_reactions
+        equilibrium constant of each reaction
+    """
     # Change in enthalpy and entropy for each reaction
-    delta_H_over_RT = np.dot(nu.T, H_over_RT(T, a))
-    delta_S_over_R = np.dot(nu.T, S_over_R(T, a))
+    delta_H_over_RT = nu.T.dot(H_over_RT(T, a).T).T
+    delta_S_over_R = nu.T.dot(S_over_R(T, a).T).T
 
     # Negative of change in Gibbs free energy for each reaction 
     delta_G_over_RT = delta_S_over_R - delta_H_over_RT
 
     # Prefactor in Ke
-    fact = p0 / R / T
+    fact = p0 / R / _species_axis(T)
 
     # Ke
-    gamma = np.sum(nu, axis=0)
-    kb = fact**gamma * np.exp(delta_G_over_RT)
+    gamma = nu.sum(axis=0)
+    if sparse.issparse(nu):
+        gamma = np.asarray(gamma).reshape(-1)
+    return fact**gamma * np.exp(delta_G_over_RT)
 
-    return kf / kb
+def backward_coeffs(kf, nu, T, a, p0=100000, R=8.3144598):
 
+    return kf / equilibrium_coeffs(nu, T, a, p0, R)
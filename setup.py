@@ -13,6 +13,9 @@ setup(name='chemkin_g10',
           'scipy',
           'requests',          
       ],
+      extras_require={
+          'numba': ['numba'],
+      },
       setup_requires=['pytest-runner'],
       tests_require=['pytest', 'pytest-cov'],
       include_package_data=True, 
@@ -0,0 +1,18 @@
+import numpy as np
+from chemkin_g10.mechanism import MechanismPlan
+
+def random_plan(num_species=12, num_reactions=30, seed=1, reversible=0.5, max_order=2):
+    """A random mechanism with 2 reactants and 3 products per reaction, of
+       orders 1 to max_order, a fraction reversible of them reversible.
+       Returns the plan with random k, kb (0 for irreversible reactions) and
+       concentrations."""
+    rng = np.random.default_rng(seed)
+    nu_react = np.zeros((num_species, num_reactions))
+    nu_prod = np.zeros((num_species, num_reactions))
+    for j in range(num_reactions):
+        nu_react[rng.choice(num_species, 2, replace=False), j] = rng.integers(1, max_order + 1, 2)
+        nu_prod[rng.choice(num_species, 3, replace=False), j] = rng.integers(1, max_order + 1, 3)
+    plan = MechanismPlan(nu_react, nu_prod, rng.random(num_reactions) < reversible)
+    k = rng.random(num_reactions)
+    kb = np.where(plan.reversible, rng.random(num_reactions), 0.0)
+    return plan, k, kb, rng.random(num_species)
@@ -0,0 +1,103 @@
+import numpy as np
+import pytest
+import chemkin_g10.computation as cp
+from chemkin_g10 import backend
+from chemkin_g10 import thermo as th
+from chemkin_g10.db import DatabaseOps
+from tests.helpers import random_plan
+import os
+path = os.path.dirname(os.path.realpath(__file__)) + "/data/db/"
+
+def test_backend_progress_rate():
+    plan, k, kb, concs = random_plan()
+    assert(np.allclose(backend.progress_rate(plan, k, kb, concs), cp.plan_progress_rate(plan, k, kb, concs), rtol=1e-13))
+
+def test_backend_reaction_rate():
+    plan, k, kb, concs = random_plan()
+    assert(np.allclose(backend.reaction_rate(plan, k, kb, concs), cp.plan_reaction_rate(plan, k, kb, concs), rtol=1e-13))
+
+def test_backend_jacobian():
+    plan, k, kb, concs = random_plan()
+    concs[3] = 0.0
+    assert(np.allclose(backend.jacobian(plan, k, kb, concs), cp.plan_jacobian(plan, k, kb, concs), rtol=1e-13))
+
+def test_backend_backward_coeffs():
+    species = ["H", "O", "OH", "H2", "H2O", "O2", "HO2", "H2O2"]
+    plan, k, kb, concs = random_plan(num_species=len(species))
+    with DatabaseOps(path + "nasa.sqlite") as dbops:
+        for T in (900.0, 1500.0):
+            a = dbops.get_coeffs(species, T)
+            ke = cp.plan_equilibrium_constant(plan, k, T, a)
+            expected = np.divide(k, ke, out=np.zeros(len(k)), where=ke != 0)
+            assert(np.allclose(backend.backward_coeffs(plan, k, T, a), expected, rtol=1e-12))
+
+def test_backend_batch_fallback():
+    plan, k, kb, concs = random_plan()
+    batch = np.stack([concs, 2 * concs])
+    assert(np.allclose(backend.reaction_rate(plan, k, kb, batch), cp.plan_reaction_rate(plan, k, kb, batch)))
+
+def test_backend_rhs():
+    plan, k, kb, concs = random_plan()
+    rhs = backend.make_rhs(plan, k, kb)
+    assert(np.allclose(rhs(concs, 0.0), cp.plan_reaction_rate(plan, k, kb, concs), rtol=1e-13))
+    assert(np.allclose(rhs.progress_rate(concs), cp.plan_progress_rate(plan, k, kb, concs), rtol=1e-13))
+
+def test_backend_kernels():
+    # the kernels themselves, whichever backend is active
+    plan, k, kb, concs = random_plan()
+    out = np.empty(plan.num_reactions)
+    backend._progress_rate(plan.react_idx, plan.react_ord, plan.prod_idx, plan.prod_ord, plan.reversible_idx,
+                           k, kb, concs, out)
+    assert(np.allclose(out, cp.plan_progress_rate(plan, k, kb, concs), rtol=1e-13))
+
+# the compiled kernels against the NumPy routines, one mechanism each with
+# mixed, only irreversible and only reversible reactions, orders up to 3
+kernel_plans = [dict(seed=2, max_order=3), dict(seed=3, reversible=0.0, max_order=3),
+                dict(seed=4, reversible=1.0, max_order=3)]
+
+def _compiled():
+    pytest.importorskip("numba")
+    if backend.BACKEND != "numba":
+        pytest.skip("numba backend disabled")
+
+def test_kernel_csr_dot():
+    _compiled()
+    for args in kernel_plans:
+        plan, k, kb, concs = random_plan(**args)
+        nu = plan.nu_csr
+        x = cp.plan_progress_rate(plan, k, kb, concs)
+        out = np.empty(plan.num_species)
+        backend._csr_dot(nu.indptr, nu.indices, nu.data, x, out)
+        assert(np.allclose(out, nu.dot(x), rtol=1e-13))
+
+def test_kernel_backward_coeffs():
+    _compiled()
+    species = ["H", "O", "OH", "H2", "H2O", "O2", "HO2", "H2O2"]
+    with DatabaseOps(path + "nasa.sqlite") as dbops:
+        for args in kernel_plans:
+            plan, k, kb, concs = random_plan(num_species=len(species), **args)
+            nu_rev, rev = plan.nu_rev, plan.reversible_idx
+            for T in (900.0, 1500.0):
+                a = dbops.get_coeffs(species, T)
+                out = np.full(plan.num_reactions, np.nan)
+                backend._backward_coeffs(nu_rev.indptr, nu_rev.indices, nu_rev.data, rev, k, T, a,
+                                         100000.0, 8.3144598, out)
+                expected = np.zeros(plan.num_reactions)
+                if len(rev):
+                    expected[rev] = th.backward_coeffs(k[rev], nu_rev, T, a)
+                assert(np.allclose(out, expected, rtol=1e-12))
+
+def test_kernel_add_jacobian():
+    _compiled()
+    for args in kernel_plans:
+        plan, k, kb, concs = random_plan(**args)
+        concs[0] = 0.0
+        nu, rev = plan.nu, plan.reversible_idx
+        out = np.zeros((plan.num_species, plan.num_species))
+        backend._add_jacobian(np.arange(plan.num_reactions), k, plan.react_idx, plan.react_ord, 1.0,
+                              nu.indptr, nu.indices, nu.data, concs, out)
+        # the forward part alone is the Jacobian without backward reactions
+        assert(np.allclose(out, cp.plan_jacobian(plan, k, np.zeros_like(kb), concs), rtol=1e-13))
+        backend._add_jacobian(rev, kb[rev], plan.prod_idx, plan.prod_ord, -1.0,
+                              nu.indptr, nu.indices, nu.data, concs, out)
+        assert(np.allclose(out, cp.plan_jacobian(plan, k, kb, concs), rtol=1e-13))
@@ -0,0 +1,86 @@
+import numpy as np
+import shutil
+import chemkin_g10.chemkin as ck
+from chemkin_g10.cache import MechanismCache
+import os
+path = os.path.dirname(os.path.realpath(__file__)) + "/data/"
+concs = np.array([0.5, 0, 0, 2, 0, 1, 0, 0])
+
+def _build(xml, cache):
+    rsystem = ck.ReactionSystem(900, 8.314, path + "db/nasa.sqlite")
+    rsystem.buildFromXml(xml, concs, cache=cache)
+    return rsystem
+
+def test_cache_hit(tmp_path):
+    cache = MechanismCache(str(tmp_path / "cache"))
+    assert(cache.load(path + "xml/rxns_reversible.xml", path + "db/nasa.sqlite", 900, 8.314) is None)
+    first = _build(path + "xml/rxns_reversible.xml", cache)
+    entry = cache.load(path + "xml/rxns_reversible.xml", path + "db/nasa.sqlite", 900, 8.314)
+    assert(entry is not None)
+    assert(entry[1] == first.species)
+    assert(isinstance(entry[0][0].nonzeroCoeffs()[0], np.memmap))
+    second = _build(path + "xml/rxns_reversible.xml", str(tmp_path / "cache"))
+    plain = ck.ReactionSystem(900, 8.314, path + "db/nasa.sqlite")
+    plain.buildFromXml(path + "xml/rxns_reversible.xml", concs)
+    for rsystem in (first, second):
+        assert(np.allclose(rsystem.k, plain.k))
+        assert(np.allclose(rsystem.a, plain.a))
+        assert(np.allclose(rsystem.getReactionRate(), plain.getReactionRate()))
+    second.updateState(T=1500)
+    plain.updateState(T=1500)
+    assert(np.allclose(second.getReactionRate(), plain.getReactionRate()))
+
+def test_cache_stale(tmp_path):
+    xml = str(tmp_path / "rxns.xml")
+    shutil.copy(path + "xml/rxns_reversible.xml", xml)
+    cache = MechanismCache(str(tmp_path / "cache"))
+    _build(xml, cache)
+    old_key = cache.key(xml, path + "db/nasa.sqlite")
+    text = open(xml).read().replace("<A>3.547e+15</A>", "<A>3.547e+16</A>", 1)
+    open(xml, "w").write(text)
+    assert(cache.load(xml, path + "db/nasa.sqlite", 900, 8.314) is None)
+    rsystem = _build(xml, cache)
+    assert(rsystem.reactionList[0].rateCoeffMeta["A"] == 3.547e+16)
+    assert([entry.name for entry in (tmp_path / "cache").iterdir()] == [cache.key(xml, path + "db/nasa.sqlite")])
+    assert(old_key != cache.key(xml, path + "db/nasa.sqlite"))
+
+def test_cache_two_databases(tmp_path):
+    xml = path + "xml/rxns_reversible.xml"
+    other = str(tmp_path / "other.sqlite")
+    shutil.copy(path + "db/nasa.sqlite", other)
+    with open(other, "ab") as f:
+        # same tables, different bytes, so a different key
+        f.write(b"\0")
+    cache = MechanismCache(str(tmp_path / "cache"))
+    _build(xml, cache)
+    rsystem = ck.ReactionSystem(900, 8.314, other)
+    rsystem.buildFromXml(xml, concs, cache=cache)
+    # both entries are kept, neither evicts the other
+    assert(cache.load(xml, path + "db/nasa.sqlite", 900, 8.314) is not None)
+    assert(cache.load(xml, other, 900, 8.314) is not None)
+
+def test_cache_no_common_tmid(tmp_path):
+    import sqlite3
+    db = str(tmp_path / "nasa.sqlite")
+    shutil.copy(path + "db/nasa.sqlite", db)
+    with sqlite3.connect(db) as conn:
+        conn.execute("UPDATE HIGH SET TLOW = TLOW + 1 WHERE SPECIES_NAME = 'O2'")
+    conn.close()
+    cache = MechanismCache(str(tmp_path / "cache"))
+    rsystem = ck.ReactionSystem(900, 8.314, db)
+    rsystem.buildFromXml(path + "xml/rxns_reversible.xml", concs, cache=cache)
+    # not cached, the system reads the database itself
+    assert(cache.load(path + "xml/rxns_reversible.xml", db, 900, 8.314) is None)
+    assert(rsystem.dbops.fileName == db)
+    assert(np.allclose(rsystem.getReactionRate(), _build(path + "xml/rxns_reversible.xml", None).getReactionRate()))
+
+def test_cache_keeps_foreign_entries(tmp_path):
+    cache = MechanismCache(str(tmp_path / "cache"))
+    # another process still writing its entry, and an entry we can't read
+    for name in (".tmp-other", "unreadable"):
+        (tmp_path / "cache" / name).mkdir(parents=True)
+        (tmp_path / "cache" / name / "header.json").write_text('{"source": ')
+    _build(path + "xml/rxns_reversible.xml", cache)
+    assert((tmp_path / "cache" / ".tmp-other" / "header.json").is_file())
+    assert((tmp_path / "cache" / "unreadable" / "header.json").is_file())
+    assert(cache.load(path + "xml/rxns_reversible.xml", path + "db/nasa.sqlite", 900, 8.314) is not None)
@@ -81,6 +81,51 @@ def test_progress_rate_nu_react_neg():
     except ValueError as err:
         assert(type(err) == ValueError)
 
+def test_progress_rate_nu_prod_neg():
+    try:
+        cp.progress_rate(np.array([[2.0, 1.0], [1.0, 0.0], [0.0, 1.0]]), np.array([[2.0, 1.0], [1.0, -1.0], [0.0, 1.0]])
+                                                ,np.array([10.0, 10.0]), np.array([2.0, 1.0, 1.0]), 1500, None, [False, False])
+    except ValueError as err:
+        assert(str(err) == "nu_11 = -1.0:  Negative stoichiometric coefficients are prohibited!")
+
+def test_progress_rate_error_order():
+    # k of the first reaction is checked before any concentration
+    try:
+        cp.progress_rate(np.array([[2.0, 1.0], [1.0, 0.0], [0.0, 1.0]]), np.array([[2.0, 1.0], [1.0, 0.0], [0.0, 1.0]])
+                                                ,np.array([-10.0, 10.0]), np.array([-2.0, 1.0, 1.0]), 1500, None, [False, False])
+    except ValueError as err:
+        assert(str(err).startswith("k = "))
+
+# Test rate_params / rate_coeffs
+metas = [{'type': 'Constant', 'k': 5.0}, {'type': 'Arrhenius', 'A': 2.0, 'E': 3.0},
+         {'type': 'modifiedArrhenius', 'A': 2.0, 'b': -0.5, 'E': 3.0}]
+
+def test_rate_coeffs():
+    k = cp.rate_coeffs(*cp.rate_params(metas), 100.0)
+    assert(np.allclose(k, [cp.k_const(5.0), cp.k_arr(2.0, 3.0, 100.0), cp.k_mod_arr(2.0, -0.5, 3.0, 100.0)]))
+
+def test_rate_coeffs_sweep():
+    T = np.array([100.0, 200.0, 300.0])
+    k = cp.rate_coeffs(*cp.rate_params(metas), T, 8.314)
+    assert(k.shape == (3, 3))
+    assert(np.allclose(k[:, 2], cp.k_mod_arr(2.0, -0.5, 3.0, T)))
+
+def test_rate_coeffs_unsupported():
+    k = cp.rate_coeffs(*cp.rate_params(metas + [{'type': 'Troe'}]), 100.0)
+    assert(np.isnan(k[3]))
+
+def test_rate_params_A_neg():
+    try:
+        cp.rate_params([{'type': 'Arrhenius', 'A': -2.0, 'E': 3.0}])
+    except ValueError as err:
+        assert(type(err) == ValueError)
+
+def test_rate_coeffs_T_neg():
+    try:
+        cp.rate_coeffs(*cp.rate_params(metas), np.array([100.0, -100.0]))
+    except ValueError as err:
+        assert(type(err) == ValueError)
+
 # Test reaction_rate
 def test_reaction_rate():
     assert(np.all(cp.reaction_rate(np.array([[2.0, 1.0], [1.0, 0.0], [0.0, 1.0]]), np.array([[0.0, 1.0], [1.0, 0.0], [0.0, 2.0]])
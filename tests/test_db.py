@@ -1,3 +1,4 @@
+import numpy as np
 from chemkin_g10.db import DatabaseOps
 import os
 path = os.path.dirname(os.path.realpath(__file__)) + "/data/db/"
@@ -30,3 +31,106 @@ def test_db_get_coeffs_none_2():
     except ValueError as err:
         assert(type(err) == ValueError)
 
+
+def test_db_get_coeffs_array_T():
+    filename = path + "nasa.sqlite"
+    dbops = DatabaseOps(filename)
+    a = dbops.get_coeffs(["O", "O2"], np.array([700, 1500]))
+    assert(a.shape == (2, 2, 7))
+    assert(np.allclose(a[0], dbops.get_coeffs(["O", "O2"], 700)))
+    assert(np.allclose(a[1], dbops.get_coeffs(["O", "O2"], 1500)))
+
+def test_db_get_coeffs_no_queries_after_load():
+    filename = path + "nasa.sqlite"
+    dbops = DatabaseOps(filename)
+    a = dbops.get_coeffs(["O", "O2"], 700)
+    statements = []
+    dbops.db.set_trace_callback(statements.append)
+    try:
+        assert(np.allclose(dbops.get_coeffs(["O", "O2"], 800), a))
+        assert(np.allclose(dbops.get_coeffs(["O2", "O"], [700, 1500])[0], a[::-1]))
+    finally:
+        dbops.db.set_trace_callback(None)
+    assert(statements == [])
+
+def test_db_get_coeffs_cache():
+    filename = path + "nasa.sqlite"
+    dbops = DatabaseOps(filename)
+    dbops.get_coeffs(["H", "O2"], 700)
+    dbops.get_coeffs(["H", "O2"], 900)
+    dbops.get_coeffs(["H", "O2"], 1500)
+    info = dbops._lookup.cache_info()
+    assert(info.hits == 1 and info.misses == 2)
+
+def test_db_get_coeffs_error_order():
+    filename = path + "nasa.sqlite"
+    dbops = DatabaseOps(filename)
+    try:
+        dbops.get_coeffs(["O2", "ABC"], 100000)
+    except ValueError as err:
+        assert(str(err) == "The temperate is beyond the range for species O2!")
+
+def test_db_shared_connection():
+    filename = path + "nasa.sqlite"
+    with DatabaseOps(filename) as first, DatabaseOps(filename) as second:
+        assert(first.db is second.db)
+        assert(first.shared.refs >= 2)
+        first.get_coeffs(["O"], 700)
+        assert(second.tables is first.tables)
+    assert(first.shared is None)
+
+def test_db_read_only():
+    import sqlite3
+    filename = path + "nasa.sqlite"
+    with DatabaseOps(filename) as dbops:
+        try:
+            dbops.db.execute("DELETE FROM LOW")
+        except sqlite3.OperationalError as err:
+            assert(type(err) == sqlite3.OperationalError)
+
+def test_db_release_without_close():
+    import gc
+    import chemkin_g10.db as db
+    filename = path + "nasa.sqlite"
+    key = os.path.realpath(filename)
+    refs = db._registry[key].refs if key in db._registry else 0
+    gc.disable()
+    try:
+        dbops = DatabaseOps(filename)
+        dbops.get_coeffs(["H", "O2"], 700)
+        assert(db._registry[key].refs == refs + 1)
+        # no reference cycle: dropping the object releases it right away
+        del dbops
+        assert(db._registry.get(key) is None or db._registry[key].refs == refs)
+    finally:
+        gc.enable()
+
+def test_db_gc_during_open(tmp_path, monkeypatch):
+    import gc
+    import shutil
+    import threading
+    import chemkin_g10.db as db
+    other = str(tmp_path / "nasa.sqlite")
+    shutil.copy(path + "nasa.sqlite", other)
+    # an unreachable cycle holding a DatabaseOps, only freed by the cyclic GC
+    holder = [DatabaseOps(path + "nasa.sqlite")]
+    holder.append(holder)
+    box = dict(holder=holder)
+    del holder
+
+    class Collecting(db._SharedDatabase):
+        def __init__(self, key):
+            box.clear()
+            gc.collect()
+            super().__init__(key)
+
+    monkeypatch.setattr(db, "_SharedDatabase", Collecting)
+    opened = []
+    thread = threading.Thread(target=lambda: opened.append(DatabaseOps(other)), daemon=True)
+    thread.start()
+    thread.join(10)
+    # the finalizer ran during open_shared without deadlocking
+    assert(not thread.is_alive() and len(opened) == 1)
+    assert(opened[0].get_coeffs(["H"], 700).shape == (1, 7))
+    opened[0].close()
+    assert(os.path.realpath(other) not in db._registry)
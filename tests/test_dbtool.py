@@ -0,0 +1,82 @@
+import numpy as np
+import sqlite3
+from chemkin_g10.db import DatabaseOps
+from chemkin_g10 import dbtool
+import os
+path = os.path.dirname(os.path.realpath(__file__)) + "/data/db/"
+species = ["H", "O", "OH", "H2", "H2O", "O2", "HO2", "H2O2"]
+temps = [300.0, 700.0, 1000.0, 1500.0, 3000.0]
+
+def _check_parity(filename):
+    with DatabaseOps(path + "nasa.sqlite") as source, DatabaseOps(filename) as packed:
+        for T in temps:
+            assert(np.array_equal(packed.get_coeffs(species, T), source.get_coeffs(species, T)))
+        assert(np.array_equal(packed.get_coeffs(species, np.array(temps)), source.get_coeffs(species, np.array(temps))))
+        try:
+            packed.get_coeffs(["ABC"], 700)
+        except ValueError as err:
+            assert(type(err) == ValueError)
+
+def test_dbtool_pack(tmp_path):
+    target = str(tmp_path / "packed.sqlite")
+    dbtool.main(["pack", path + "nasa.sqlite", target])
+    _check_parity(target)
+    db = sqlite3.connect(target)
+    plan = db.execute("EXPLAIN QUERY PLAN SELECT * FROM NASA WHERE SPECIES_NAME = ?", ("O2",)).fetchall()
+    assert("INDEX" in plan[0][-1])
+    low = db.execute("SELECT TLOW, THIGH, COEFF_1 FROM LOW WHERE SPECIES_NAME = 'O2'").fetchall()
+    db.close()
+    assert(len(low) == 1)
+
+def _positional_coeffs(db, species, T):
+    # the original get_coeffs: SELECT * and columns by position
+    a = []
+    for s in species:
+        for table in ("LOW", "HIGH"):
+            res = db.execute('SELECT * FROM {} WHERE SPECIES_NAME = ?'.format(table), (s,)).fetchall()
+            if res[0][2] <= T and T <= res[0][3]:
+                a.append(list(res[0][-7:]))
+                break
+        else:
+            raise ValueError("The temperate is beyond the range for species {}!".format(s))
+    return np.array(a)
+
+def test_dbtool_pack_views(tmp_path):
+    target = str(tmp_path / "packed.sqlite")
+    dbtool.pack_database(path + "nasa.sqlite", target)
+    source, packed = sqlite3.connect(path + "nasa.sqlite"), sqlite3.connect(target)
+    try:
+        for table in ("LOW", "HIGH"):
+            columns = [row[1] for row in source.execute("PRAGMA table_info({})".format(table))]
+            assert([row[1] for row in packed.execute("PRAGMA table_info({})".format(table))] == columns)
+        for T in temps:
+            assert(np.array_equal(_positional_coeffs(packed, species, T), _positional_coeffs(source, species, T)))
+    finally:
+        source.close()
+        packed.close()
+
+def test_dbtool_pack_exists(tmp_path):
+    target = tmp_path / "packed.sqlite"
+    target.touch()
+    try:
+        dbtool.pack_database(path + "nasa.sqlite", str(target))
+    except ValueError as err:
+        assert(type(err) == ValueError)
+
+def test_dbtool_export_npy(tmp_path):
+    target = str(tmp_path / "nasa.npy")
+    dbtool.main(["export", path + "nasa.sqlite", target])
+    _check_parity(target)
+    with DatabaseOps(target) as dbops:
+        assert(dbops.db is None)
+
+def test_dbtool_export_npz(tmp_path):
+    target = str(tmp_path / "nasa.npz")
+    dbtool.export_coefficients(path + "nasa.sqlite", target)
+    _check_parity(target)
+
+def test_dbtool_export_suffix(tmp_path):
+    try:
+        dbtool.export_coefficients(path + "nasa.sqlite", str(tmp_path / "nasa.bin"))
+    except ValueError as err:
+        assert(type(err) == ValueError)
@@ -0,0 +1,86 @@
+import numpy as np
+import chemkin_g10.chemkin as ck
+import chemkin_g10.computation as cp
+from chemkin_g10 import simulator as sim
+from chemkin_g10 import thermo as th
+from chemkin_g10.db import DatabaseOps
+from chemkin_g10.energy import EnergyRHS
+import os
+path = os.path.dirname(os.path.realpath(__file__)) + "/data/xml/"
+path2 = os.path.dirname(os.path.realpath(__file__)) + "/data/db/"
+concs = np.array([0.5, 0, 0, 2, 0, 1, 0, 0]) * 40
+
+def _system(T=1000):
+    rsystem = ck.ReactionSystem(T, 8.314, path2 + "nasa.sqlite")
+    rsystem.buildFromXml(path + "rxns_reversible.xml", concs)
+    return rsystem
+
+def _internal_energy(energy, yout, Tout):
+    return np.array([np.dot(y, th.H_over_RT(T, energy.coeffs(T)) - 1.0) * T for y, T in zip(yout, Tout)])
+
+def test_cp_over_R():
+    with DatabaseOps(path2 + "nasa.sqlite") as dbops:
+        a = dbops.get_coeffs(["H2O", "O2"], 700.0)
+    # Cp/R = d(H/R)/dT
+    dT = 1e-3
+    dH = (th.H_over_RT(700.0 + dT, a) * (700.0 + dT) - th.H_over_RT(700.0 - dT, a) * (700.0 - dT)) / 2 / dT
+    assert(np.allclose(th.Cp_over_R(700.0, a), dH))
+
+def test_get_range_coeffs():
+    species = ["H2O", "O2"]
+    with DatabaseOps(path2 + "nasa.sqlite") as dbops:
+        Tlow, Tmid, Thigh, low, high = dbops.get_range_coeffs(species)
+        assert(np.array_equal(low, dbops.get_coeffs(species, 500.0)))
+        assert(np.array_equal(high, dbops.get_coeffs(species, 2000.0)))
+        assert(np.all(Tlow < Tmid) and np.all(Tmid < Thigh))
+        try:
+            dbops.get_range_coeffs(["ABC"])
+        except ValueError as err:
+            assert(type(err) == ValueError)
+
+def test_energy_rhs():
+    rsystem = _system()
+    energy = EnergyRHS(rsystem)
+    # at the temperature of the system, the species rates are the isothermal ones
+    dy = energy(np.append(concs, 1000.0))
+    assert(np.allclose(dy[:-1], rsystem.reaction_rate))
+    assert(np.allclose(energy.rate_coeffs(1000.0), rsystem.k))
+    assert(np.array_equal(energy.coeffs(1000.0), rsystem.a))
+    assert(energy.coeffs(np.array([500.0, 2000.0])).shape == (2, 8, 7))
+    # the first (chain-branching) steps are endothermic, so T drops at first
+    U_RT = th.H_over_RT(1000.0, rsystem.a) - 1.0
+    Cv_R = th.Cp_over_R(1000.0, rsystem.a) - 1.0
+    assert(np.isclose(dy[-1], -1000.0 * np.dot(U_RT, dy[:-1]) / np.dot(concs, Cv_R)))
+    assert(dy[-1] < 0)
+    assert(energy.jac_pattern().shape == (9, 9))
+
+def test_simulator_adiabatic():
+    rsystem = _system()
+    s = sim.Simulator(rsystem, 1e4, solver="BDF", adiabatic=True, sampling="log")
+    s.solveODE()
+    assert(s.yout.shape == (100, 8) and s.Tout.shape == (100,))
+    assert(s.Tout[0] == 1000 and s.Tout[-1] > 1200)
+    # adiabatic, constant volume: the internal energy is conserved
+    U = _internal_energy(s._energy, s.yout, s.Tout)
+    assert(np.allclose(U, U[0], rtol=1e-6))
+    # equilibrium at the final temperature
+    assert(s.check_equilibrium(0, s.tout[-1]) == True)
+    ke = cp.plan_equilibrium_constant(rsystem.plan, rsystem.k, s.Tout[-1], s._energy.coeffs(s.Tout[-1]))
+    log_q, sign = cp.plan_log_reaction_quotient(rsystem.plan, s.yout[-1])
+    assert(np.isclose(np.exp(log_q[0]), ke[0], rtol=1e-4))
+
+    odeint = sim.Simulator(rsystem, 1e4, adiabatic=True, sampling="adaptive")
+    odeint.solveODE()
+    assert(odeint.solver_stats["solver"] == "LSODA")
+    assert(np.isclose(odeint.Tout[-1], s.Tout[-1], rtol=1e-6))
+    assert(odeint.interpolate(odeint.tout[-1]).shape == (9,))
+
+def test_simulator_adiabatic_invalid(tmp_path):
+    rsystem = _system()
+    for args in [dict(stopAtEquilibrium=True), dict(outputDir=str(tmp_path))]:
+        try:
+            sim.Simulator(rsystem, 1e4, adiabatic=True, **args)
+        except ValueError as err:
+            assert(type(err) == ValueError)
+        else:
+            assert(False)
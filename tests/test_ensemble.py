@@ -0,0 +1,27 @@
+import numpy as np
+import chemkin_g10.chemkin as ck
+from chemkin_g10 import simulator as sim
+from chemkin_g10.ensemble import Ensemble
+
+def build(T, concs):
+    rsystem = ck.ReactionSystem(T, 8.314, "tests/data/db/nasa.sqlite")
+    rsystem.buildFromXml("tests/data/xml/rxns_reversible.xml", concs)
+    return rsystem
+
+def test_ensemble_matches_simulator():
+    concs = np.array([0.5, 0, 0, 2, 0, 1, 0, 0])
+    scenarios = [dict(T=900), dict(T=1000, concs=2 * concs), dict(maxTime=0.05)]
+    ensemble = Ensemble(build(900, concs), 0.1, maxWorkers=2)
+    results = ensemble.runAll(scenarios)
+    assert([r['index'] for r in results] == [0, 1, 2])
+    for res, (T, c, maxTime) in zip(results, [(900, concs, 0.1), (1000, 2 * concs, 0.1), (900, concs, 0.05)]):
+        s = sim.Simulator(build(T, c), maxTime)
+        s.solveODE()
+        assert(np.allclose(res['tout'], s.tout))
+        assert(np.allclose(res['yout'], s.yout))
+
+def test_ensemble_streams_results():
+    concs = np.array([0.5, 0, 0, 2, 0, 1, 0, 0])
+    ensemble = Ensemble(build(900, concs), 0.1, maxWorkers=2, numSample=20)
+    indices = sorted(r['index'] for r in ensemble.run([dict(T=T) for T in (800, 900, 1000, 1100)]))
+    assert(indices == [0, 1, 2, 3])
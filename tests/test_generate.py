@@ -0,0 +1,57 @@
+import numpy as np
+import chemkin_g10.chemkin as ck
+from chemkin_g10 import generate
+from chemkin_g10.db import DatabaseOps
+
+def test_generate_build(tmp_path):
+    xml, db = str(tmp_path / "mech.xml"), str(tmp_path / "thermo.sqlite")
+    species = generate.generate(xml, db, 80, 300, seed=3)
+    assert(len(species) == 80 and len(set(species)) == 80)
+    assert("O2" in species and "O2_1" in species)
+    rsystem = ck.ReactionSystem(1000, 8.314, db)
+    rsystem.buildFromXml(xml, np.ones(80))
+    assert(rsystem.species == species)
+    assert(len(rsystem.reactionList) == 300)
+    types = set(r.rateCoeffMeta["type"] for r in rsystem.reactionList)
+    assert(types == set(generate.RATE_TYPES))
+    assert(0 < sum(rsystem.reversibleFlagList) < 300)
+    assert(np.all(np.isfinite(rsystem.getReactionRate())))
+    # every reaction touches at most 4 species
+    assert(all(len(r.nonzeroCoeffs()[0]) <= 4 for r in rsystem.reactionList))
+
+def test_generate_thermo_copies(tmp_path):
+    db = str(tmp_path / "thermo.npy")
+    species = generate.write_thermo(db, 60)
+    assert(species[:2] == ["O", "O2"] and species[54] == "O2_1")
+    with DatabaseOps(db) as copied, DatabaseOps(generate.DEFAULT_DB) as source:
+        for T in [500.0, 1500.0]:
+            assert(np.array_equal(copied.get_coeffs(["O2_1", "H2O"], T), source.get_coeffs(["O2", "H2O"], T)))
+
+def test_generate_options(tmp_path):
+    xml, db = str(tmp_path / "mech.xml"), str(tmp_path / "thermo.npz")
+    generate.main([xml, db, "--species", "3", "--reactions", "50", "--reversible", "0",
+                   "--rate-types", "Arrhenius", "--seed", "0"])
+    reactionList, species = ck.ReactionSystem.parse(xml, 1000, 8.314)
+    assert(len(species) == 3 and len(reactionList) == 50)
+    assert(all(r.reactMeta["reversible"] == "no" for r in reactionList))
+    assert(all(r.rateCoeffMeta["type"] == "Arrhenius" for r in reactionList))
+    # same seed, same file
+    again = str(tmp_path / "again.xml")
+    generate.write_mechanism(again, species, 50, 0, ["Arrhenius"], seed=0)
+    assert(open(again).read() == open(xml).read())
+
+def test_generate_invalid(tmp_path):
+    xml = str(tmp_path / "mech.xml")
+    for kwargs in [dict(num_reactions=0), dict(reversible=2), dict(rate_types=["Troe"])]:
+        args = dict(target=xml, species=["H", "O"], num_reactions=10)
+        args.update(kwargs)
+        try:
+            generate.write_mechanism(**args)
+        except ValueError as err:
+            assert(type(err) == ValueError)
+        else:
+            assert(False)
+    try:
+        generate.write_thermo(str(tmp_path / "thermo.npy"), 1)
+    except ValueError as err:
+        assert(type(err) == ValueError)
@@ -0,0 +1,104 @@
+import numpy as np
+import chemkin_g10.computation as cp
+from chemkin_g10.mechanism import MechanismPlan
+
+nu_react = np.array([[2.0, 0.0, 1.0], [1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 0.0]])
+nu_prod = np.array([[0.0, 1.0, 0.0], [0.0, 0.0, 0.0], [2.0, 0.0, 1.0], [1.0, 0.0, 1.0]])
+
+def test_plan_shapes():
+    plan = MechanismPlan(nu_react, nu_prod, [True, False, True])
+    assert(len(plan) == 3)
+    assert(plan.num_species == 4)
+    assert(plan.nu_react.nnz == 4)
+    assert(np.all(plan.reversible_idx == [0, 2]))
+    assert(np.allclose(plan.nu.toarray(), nu_prod - nu_react))
+    assert(np.allclose(plan.nu_rev.toarray(), (nu_prod - nu_react)[:, [0, 2]]))
+
+def test_plan_reactants():
+    plan = MechanismPlan(nu_react, nu_prod, [True, False, True])
+    idx, order = plan.reactants(0)
+    assert(np.all(idx == [0, 1]))
+    assert(np.all(order == [2.0, 1.0]))
+    idx, order = plan.reactants(1)
+    assert(np.all(idx == [2]))
+    assert(np.all(order == [1.0]))
+
+def test_plan_immutable():
+    plan = MechanismPlan(nu_react, nu_prod, [True, False, True])
+    try:
+        plan.reversible_idx = np.array([0])
+    except AttributeError as err:
+        assert(type(err) == AttributeError)
+    try:
+        plan.react_ord[0, 0] = 5.0
+    except ValueError as err:
+        assert(type(err) == ValueError)
+
+def test_plan_nu_neg():
+    try:
+        MechanismPlan(-nu_react, nu_prod, [False, False, False])
+    except ValueError as err:
+        assert(type(err) == ValueError)
+
+def test_plan_progress_rate():
+    plan = MechanismPlan(nu_react, nu_prod, [True, False, True])
+    k = np.array([10.0, 20.0, 30.0])
+    kb = np.array([1.0, 0.0, 2.0])
+    concs = np.array([2.0, 1.0, 0.5, 0.0])
+    rates = cp.plan_progress_rate(plan, k, kb, concs)
+    assert(np.allclose(rates, [40.0, 10.0, 60.0]))
+    assert(np.allclose(cp.plan_reaction_rate(plan, k, kb, concs), np.dot(nu_prod - nu_react, rates)))
+
+def test_plan_jacobian():
+    plan = MechanismPlan(nu_react, nu_prod, [True, False, True])
+    k = np.array([10.0, 20.0, 30.0])
+    kb = np.array([1.0, 0.0, 2.0])
+    concs = np.array([2.0, 1.0, 0.5, 0.3])
+    jac = cp.plan_jacobian(plan, k, kb, concs)
+    numeric = np.zeros((4, 4))
+    for l in range(4):
+        step = np.zeros(4)
+        step[l] = 1e-6
+        numeric[:, l] = (cp.plan_reaction_rate(plan, k, kb, concs + step) - cp.plan_reaction_rate(plan, k, kb, concs - step)) / 2e-6
+    assert(np.allclose(jac, numeric))
+    assert(np.allclose(cp.plan_jacobian(plan, k, kb, concs, sparse_output=True).toarray(), jac))
+
+def test_plan_jacobian_pattern():
+    plan = MechanismPlan(nu_react, nu_prod, [True, False, True])
+    jac = cp.plan_jacobian(plan, np.ones(3), np.ones(3), np.ones(4))
+    assert(np.all(plan.jac_pattern.toarray()[jac != 0]))
+
+def test_plan_log_reaction_quotient():
+    plan = MechanismPlan(nu_react, nu_prod, [True, False, True])
+    concs = np.array([[2.0, 1.0, 0.5, 0.3], [1.0, -2.0, 3.0, 1.0]])
+    log_q, sign = cp.plan_log_reaction_quotient(plan, concs)
+    quotient = np.prod(concs[:, :, np.newaxis] ** nu_prod, axis=1) / np.prod(concs[:, :, np.newaxis] ** nu_react, axis=1)
+    assert(np.allclose(sign * np.exp(log_q), quotient))
+
+def test_plan_pickle():
+    import pickle
+    plan = pickle.loads(pickle.dumps(MechanismPlan(nu_react, nu_prod, [True, False, True])))
+    assert(np.all(plan.reversible_idx == [0, 2]))
+    assert(not plan.react_ord.flags.writeable)
+
+def test_plan_lazy():
+    plan = MechanismPlan(nu_react, nu_prod, [True, False, True])
+    # only computed, and then frozen, on first use
+    assert("jac_pattern" not in vars(plan) and "nu_csr" not in vars(plan))
+    assert(plan.jac_pattern is plan.jac_pattern)
+    assert(not plan.nu_csr.data.flags.writeable)
+    try:
+        plan.nu_csr = None
+    except AttributeError as err:
+        assert(type(err) == AttributeError)
+
+def test_dense_plan():
+    reversible = [True, False, True]
+    plan, dense = MechanismPlan(nu_react, nu_prod, reversible), cp._DensePlan(nu_react, nu_prod, reversible)
+    for name in ["reversible_idx", "react_idx", "react_ord", "prod_idx", "prod_ord"]:
+        assert(np.array_equal(getattr(dense, name), getattr(plan, name)))
+    assert(np.array_equal(dense.nu, plan.nu.toarray()) and np.array_equal(dense.nu_rev, plan.nu_rev.toarray()))
+    try:
+        cp._DensePlan(nu_react, nu_prod, [True])
+    except ValueError as err:
+        assert(type(err) == ValueError)
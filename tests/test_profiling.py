@@ -0,0 +1,62 @@
+import numpy as np
+import chemkin_g10.chemkin as ck
+from chemkin_g10 import simulator as sim
+from chemkin_g10.profiling import Profiler
+import os
+path = os.path.dirname(os.path.realpath(__file__)) + "/data/xml/"
+path2 = os.path.dirname(os.path.realpath(__file__)) + "/data/db/"
+concs = np.array([0.5, 0, 0, 2, 0, 1, 0, 0])
+
+def test_profiler_counts():
+    profiler = Profiler()
+    square = profiler.wrap("square", lambda x: x * x)
+    assert(square(3) == 9 and square(4) == 16)
+    with profiler.timer("block"):
+        pass
+    report = profiler.report()
+    assert(report["square"]["calls"] == 2 and report["block"]["calls"] == 1)
+    assert(report["square"]["time"] >= 0 and "solver" not in report)
+    assert("square" in str(profiler))
+    profiler.reset()
+    assert(profiler.report() == {})
+
+def test_profiler_system_and_odeint():
+    profiler = Profiler()
+    rsystem = ck.ReactionSystem(900, 8.314, path2 + "nasa.sqlite", profiler=profiler)
+    rsystem.buildFromXml(path + "rxns_reversible.xml", concs)
+    rsystem.updateState(T=1000)
+    rsystem.getReactionRate()
+    report = profiler.report()
+    assert(report["parse"]["calls"] == 1)
+    assert(report["db_query"]["calls"] == 2)
+    assert(report["backward_coeffs"]["calls"] == 1)
+
+    s = sim.Simulator(rsystem, 0.05)
+    s.solveODE()
+    report = profiler.report()
+    stats = report["solver"]
+    assert(stats == s.solver_stats and stats["solver"] == "odeint")
+    assert(stats["steps"] > 0 and stats["nje"] == report["jacobian"]["calls"])
+    # odeint counts its own calls of rhs, including finite differences
+    assert(report["rhs"]["calls"] == stats["nfe"])
+    assert(stats["method"] in ("adams", "bdf") and stats["method_switches"] >= 0)
+    assert(report["integrate"]["calls"] == 1)
+
+def test_profiler_solve_ivp():
+    rsystem = ck.ReactionSystem(900, 8.314, path2 + "nasa.sqlite")
+    rsystem.buildFromXml(path + "rxns_reversible.xml", concs)
+    profiler = Profiler()
+    s = sim.Simulator(rsystem, 0.05, solver="BDF", profiler=profiler)
+    s.solveODE()
+    report = profiler.report()
+    assert(report["solver"]["nfe"] == report["rhs"]["calls"])
+    assert(report["solver"]["nje"] == report["jacobian"]["calls"])
+    # the system has no profiler of its own
+    assert("parse" not in report)
+
+def test_profiler_disabled():
+    rsystem = ck.ReactionSystem(900, 8.314, path2 + "nasa.sqlite")
+    rsystem.buildFromXml(path + "rxns_reversible.xml", concs)
+    s = sim.Simulator(rsystem, 0.05)
+    s.solveODE()
+    assert(s.profiler is None and s.solver_stats["nfe"] > 0)
@@ -0,0 +1,37 @@
+import numpy as np
+import tracemalloc
+import chemkin_g10.computation as cp
+from chemkin_g10.mechanism import MechanismPlan
+from chemkin_g10.rhs import ReactionRateRHS
+from tests.helpers import random_plan
+
+def test_rhs_parity():
+    plan, k, kb, concs = random_plan(60, 300, seed=0)
+    rhs = ReactionRateRHS(plan, k, kb)
+    assert(np.allclose(rhs.progress_rate(concs), cp.plan_progress_rate(plan, k, kb, concs)))
+    assert(np.allclose(rhs(concs), cp.plan_reaction_rate(plan, k, kb, concs)))
+    # a second call overwrites the same buffer
+    assert(rhs(2 * concs) is rhs(concs))
+
+def test_rhs_unused_species():
+    nu_react = np.array([[1.0], [0.0], [0.0]])
+    nu_prod = np.array([[0.0], [1.0], [0.0]])
+    rhs = ReactionRateRHS(MechanismPlan(nu_react, nu_prod, [True]), np.array([2.0]), np.array([1.0]))
+    assert(np.allclose(rhs(np.array([3.0, 1.0, 5.0])), [-5.0, 5.0, 0.0]))
+
+def test_rhs_no_allocation():
+    plan, k, kb, concs = random_plan(60, 300, seed=0)
+    rhs = ReactionRateRHS(plan, k, kb)
+    rhs(concs)
+    tracemalloc.start()
+    try:
+        rhs(concs)
+        tracemalloc.reset_peak()
+        start = tracemalloc.get_traced_memory()[0]
+        for i in range(100):
+            rhs(concs)
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    # far below a single scratch array of the mechanism
+    assert(peak - start < rhs.terms.nbytes)